@@ -0,0 +1,173 @@
+import pygame
+import hashlib
+import json
+import mmap
+import os
+import sys
+from settings import *
+from utils import resource_path
+
+BUNDLE_PATH = "resources/assets.bundle"
+MANIFEST_PATH = "resources/assets.bundle.json"
+SOURCE_DIR = "resources/assets"
+BUNDLE_VERSION = 1
+
+# path -> (kích thước Game dùng, [kích thước cuối cùng entity dùng]), lấy từ SPRITE_ASSETS
+SPRITE_SPECS = {path: (base_size, list(sizes.values()))
+                for files, base_size, sizes in SPRITE_ASSETS.values()
+                for path in (files if isinstance(files, list) else [files])}
+
+# (path, kích thước, alpha) của các ảnh màn hình
+SCREEN_SPECS = [
+    ("resources/assets/backgrounds/test.jpg", (WIDTH, HEIGHT), False),
+    ("resources/assets/backgrounds/bg_startgame2.jpg", (WIDTH, HEIGHT), False),
+    ("resources/assets/icon/return_icon.png", (32, 32), True),
+]
+
+def bundle_specs():
+    """Danh sách (path, kích thước, alpha) của mọi surface được đóng gói"""
+    specs = []
+    for path, (base_size, final_sizes) in SPRITE_SPECS.items():
+        specs.append((path, base_size, True))
+        specs.extend((path, size, True) for size in final_sizes)
+    specs.extend(SCREEN_SPECS)
+    return specs
+
+def file_hash(full_path):
+    h = hashlib.sha256()
+    with open(full_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def source_files():
+    """Mọi file trong resources/assets (đường dẫn tương đối)"""
+    base = resource_path(SOURCE_DIR)
+    files = []
+    for root, _, names in os.walk(base):
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), resource_path(""))
+            files.append(rel.replace(os.sep, "/"))
+    return sorted(files)
+
+def source_stat(rel):
+    st = os.stat(resource_path(rel))
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def read_manifest(manifest_path=MANIFEST_PATH):
+    try:
+        with open(resource_path(manifest_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def build_bundle(force=False, bundle_path=BUNDLE_PATH, manifest_path=MANIFEST_PATH):
+    """
+    Dựng file bundle nếu nội dung resources/assets đã thay đổi
+    Trả về True nếu bundle được dựng lại
+    """
+    hashes = {rel: file_hash(resource_path(rel)) for rel in source_files()}
+    manifest = read_manifest(manifest_path)
+    if (not force and manifest and manifest.get("version") == BUNDLE_VERSION
+            and {rel: info["sha256"] for rel, info in manifest["sources"].items()} == hashes
+            and os.path.exists(resource_path(bundle_path))):
+        return False
+
+    decoded = {}
+    entries = []
+    offset = 0
+    with open(resource_path(bundle_path), "wb") as out:
+        for path, size, alpha in bundle_specs():
+            if path not in decoded:
+                decoded[path] = pygame.image.load(resource_path(path))
+            raw = decoded[path]
+            if alpha:
+                surface = pygame.transform.smoothscale(raw.convert_alpha(), size)
+                fmt = "RGBA"
+            else:
+                surface = pygame.transform.scale(raw.convert(), size)
+                fmt = "RGB"
+            data = pygame.image.tobytes(surface, fmt)
+            out.write(data)
+            entries.append({"path": path, "size": list(size), "alpha": alpha,
+                            "format": fmt, "offset": offset, "length": len(data)})
+            offset += len(data)
+
+    sources = {rel: dict(sha256=digest, **source_stat(rel)) for rel, digest in hashes.items()}
+    with open(resource_path(manifest_path), "w", encoding="utf-8") as f:
+        json.dump({"version": BUNDLE_VERSION, "sources": sources, "entries": entries}, f, indent=1)
+    return True
+
+class AssetBundle:
+    def __init__(self, bundle_path, manifest):
+        """Bundle đã memory-map: surface tạo thẳng từ buffer, không giải mã / resample"""
+        self.file = open(resource_path(bundle_path), "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.entries = {}
+        self.paths = set()
+        self.missing = set()
+        for entry in manifest["entries"]:
+            full_path = resource_path(entry["path"])
+            self.entries[(full_path, tuple(entry["size"]), entry["alpha"])] = entry
+            self.paths.add(full_path)
+
+    @classmethod
+    def open(cls, bundle_path=BUNDLE_PATH, manifest_path=MANIFEST_PATH):
+        """Mở bundle; trả về None nếu thiếu hoặc đã cũ so với file nguồn"""
+        manifest = read_manifest(manifest_path)
+        if not manifest or manifest.get("version") != BUNDLE_VERSION:
+            return None
+        if not os.path.exists(resource_path(bundle_path)):
+            return None
+        try:
+            for rel in {entry["path"] for entry in manifest["entries"]}:
+                info = manifest["sources"][rel]
+                if source_stat(rel) == {"size": info["size"], "mtime_ns": info["mtime_ns"]}:
+                    continue
+                # mtime đổi (checkout mới, touch) chưa chắc nội dung đổi: so hash trước khi bỏ bundle
+                if file_hash(resource_path(rel)) != info["sha256"]:
+                    print(f"Asset bundle is stale ({rel}), run: python asset_bundle.py", file=sys.stderr)
+                    return None
+        except (OSError, KeyError):
+            return None
+        return cls(bundle_path, manifest)
+
+    def has_path(self, full_path):
+        return full_path in self.paths
+
+    def surface(self, full_path, size, alpha):
+        """Tạo surface từ vùng nhớ của bundle, None nếu không có"""
+        key = (full_path, tuple(size) if size else None, alpha)
+        entry = self.entries.get(key)
+        if entry is None:
+            # file có trong bundle nhưng thiếu kích thước này: phải giải mã + scale lại từ file gốc
+            if full_path in self.paths and key not in self.missing:
+                self.missing.add(key)
+                print(f"Asset bundle has no {os.path.relpath(full_path, resource_path(''))} at size {key[1]}"
+                      f" (alpha={alpha}), loading from file", file=sys.stderr)
+            return None
+        view = memoryview(self.buffer)[entry["offset"]:entry["offset"] + entry["length"]]
+        surface = pygame.image.frombuffer(view, tuple(entry["size"]), entry["format"])
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def close(self):
+        """Bỏ memory map và đóng file bundle (surface đã tạo không bị ảnh hưởng)"""
+        if self.buffer is not None:
+            self.buffer.close()
+            self.file.close()
+            self.buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    if build_bundle(force="--force" in sys.argv):
+        print(f"Built {BUNDLE_PATH}")
+    else:
+        print(f"{BUNDLE_PATH} is up to date")
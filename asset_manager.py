@@ -0,0 +1,106 @@
+import pygame
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from utils import resource_path
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class AssetManager:
+    def __init__(self, max_workers=4, bundle=None):
+        """
+        Quản lý tài nguyên dùng chung cho mọi màn hình
+        Giải mã file song song lúc khởi động, trả về cùng một surface cho các lần gọi sau
+        bundle: AssetBundle đã dựng sẵn (None -> đọc file như bình thường)
+        """
+        self.max_workers = max_workers
+        self.bundle = bundle
+        self.decoded = {}
+        self.surfaces = {}
+        self.sounds = {}
+        self.music_stream = None
+        self.file_loads = 0
+
+    def key(self, path):
+        return resource_path(path)
+
+    def _read(self, full_path):
+        """Chạy trong thread: giải mã ảnh hoặc đọc bytes âm thanh"""
+        if full_path.lower().endswith(IMAGE_EXTENSIONS):
+            return pygame.image.load(full_path)
+        with open(full_path, "rb") as f:
+            return f.read()
+
+    def preload(self, paths):
+        """Giải mã song song các file chưa có trong cache"""
+        pending = [self.key(p) for p in paths]
+        pending = [p for p in dict.fromkeys(pending) if p not in self.decoded and p not in self.sounds]
+        if self.bundle:
+            pending = [p for p in pending if not self.bundle.has_path(p)]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self._read, pending))
+
+        for full_path, data in zip(pending, results):
+            self.file_loads += 1
+            if isinstance(data, bytes):
+                self.sounds[full_path] = data
+            else:
+                self.decoded[full_path] = data
+
+    def image(self, path, size=None, alpha=True, smooth=True, convert=True):
+        """
+        Lấy surface đã convert (và scale nếu có size)
+        alpha: convert_alpha() thay vì convert()
+        smooth: dùng smoothscale thay vì scale
+        convert: False -> giữ định dạng gốc, dùng được khi chưa mở cửa sổ (headless)
+        """
+        full_path = self.key(path)
+        cache_key = (full_path, tuple(size) if size else None, alpha, smooth, convert)
+        surface = self.surfaces.get(cache_key)
+        if surface is not None:
+            return surface
+
+        if self.bundle and convert:
+            surface = self.bundle.surface(full_path, size, alpha)
+            if surface is not None:
+                self.surfaces[cache_key] = surface
+                return surface
+
+        if full_path not in self.decoded:
+            self.decoded[full_path] = self._read(full_path)
+            self.file_loads += 1
+        raw = self.decoded[full_path]
+        if not convert:
+            surface = raw
+        else:
+            surface = raw.convert_alpha() if alpha else raw.convert()
+        if size:
+            scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+            surface = scale(surface, size)
+
+        self.surfaces[cache_key] = surface
+        return surface
+
+    def close(self):
+        """Đóng bundle (nếu có); surface đã nạp vẫn dùng được"""
+        if self.bundle:
+            self.bundle.close()
+            self.bundle = None
+
+    def sound_bytes(self, path):
+        """Lấy nội dung file âm thanh (chỉ đọc đĩa một lần)"""
+        full_path = self.key(path)
+        if full_path not in self.sounds:
+            self.preload([full_path])
+        return self.sounds[full_path]
+
+    def play_music(self, path, volume, loops=-1):
+        """Phát nhạc nền từ bộ nhớ thay vì mở lại file"""
+        data = self.sound_bytes(path)
+        self.music_stream = io.BytesIO(data)
+        pygame.mixer.music.load(self.music_stream, os.path.splitext(path)[1].lstrip("."))
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
@@ -0,0 +1,160 @@
+import pygame
+import math
+from collections import OrderedDict
+from settings import *
+
+class LayerCompositor:
+    def __init__(self, background):
+        """
+        Dựng sẵn các lớp tĩnh của nền theo theme
+        background: ảnh nền đã scale về (WIDTH, HEIGHT)
+        """
+        self.background = background
+        self.layers = {}
+        self.bakes = 0
+
+    def get_layers(self, theme):
+        """Lấy (nền đã nhân ánh sáng, lớp phủ nước + tối) của theme"""
+        layers = self.layers.get(theme['name'])
+        if layers is None:
+            layers = self.bake(theme)
+            self.layers[theme['name']] = layers
+        return layers
+
+    def bake(self, theme):
+        """Dựng các lớp tĩnh một lần cho theme"""
+        self.bakes += 1
+        lit_background = None
+        if self.background:
+            lit_background = pygame.Surface((WIDTH, HEIGHT))
+            lit_background.blit(self.background, (0, 0))
+
+            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            overlay.fill((255, 255, 255, int(255 * theme['ambient_light'])))
+            lit_background.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+        top_layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        for y in range(0, HEIGHT, 4):
+            alpha = int(80 * (1 - y / HEIGHT))
+            water_color = (*theme['water_color'][:3], alpha)
+            pygame.draw.line(top_layer, water_color, (0, y), (WIDTH, y))
+
+        if theme['name'] == "Đêm":
+            dark_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            dark_overlay.fill((0, 0, 0, 100))
+            top_layer.blit(dark_overlay, (0, 0))
+
+        return lit_background, top_layer
+
+    def invalidate(self, old_theme=None, new_theme=None):
+        """Bỏ các lớp của theme vừa chuyển đi"""
+        if old_theme is None:
+            self.layers.clear()
+        else:
+            self.layers.pop(old_theme['name'], None)
+
+class WaveFrameCache:
+    def __init__(self, compositor, phase_steps=WAVE_PHASE_STEPS, max_frames=WAVE_CACHE_SIZE):
+        """
+        Cache các frame nền sóng dưới dạng dải ngang, không giữ frame toàn màn hình
+        Mỗi theme có một lớp nền (ảnh nền đã nhân ánh sáng + lớp phủ nước); mỗi (theme, pha) là danh sách
+        dải (độ lệch x, vùng) của lớp nền đó. Vẽ một frame = một lần Surface.blits lên màn hình
+        compositor: LayerCompositor cung cấp các lớp tĩnh theo theme
+        phase_steps: số pha sóng trong một chu kỳ
+        max_frames: số (theme, pha) tối đa giữ trong cache (LRU)
+        """
+        self.compositor = compositor
+        self.phase_steps = max(1, phase_steps)
+        # luôn giữ đủ một chu kỳ của một theme, nếu không prepare() tự đẩy frame của chính nó ra
+        self.max_frames = max(self.phase_steps, max_frames)
+        self.frames = OrderedDict()
+        self.bases = {}
+        self.hits = 0
+        self.misses = 0
+
+    def phase_index(self, wave_offset):
+        """Lượng tử hóa wave_offset thành chỉ số pha"""
+        phase = (wave_offset * 0.01) % (2 * math.pi)
+        return int(round(phase / (2 * math.pi) * self.phase_steps)) % self.phase_steps
+
+    def get_frame(self, theme, wave_offset):
+        """Lấy (lớp nền, các dải) cho theme và pha hiện tại"""
+        key = (theme['name'], self.phase_index(wave_offset))
+        strips = self.frames.get(key)
+        if strips is not None:
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return self.bases[theme['name']], strips
+
+        self.misses += 1
+        self.prepare(theme)
+        return self.bases[theme['name']], self.frames[key]
+
+    def draw(self, target, theme, wave_offset, scroll_y=0):
+        """Vẽ frame nền của theme lên target, cuộn xuống scroll_y (0..HEIGHT) và quay vòng theo chiều dọc"""
+        base, strips = self.get_frame(theme, wave_offset)
+        blits = []
+        for x, y, area in strips:
+            top = y + scroll_y
+            if top < HEIGHT:
+                blits.append((base, (x, top), area))
+            if top + area.height > HEIGHT:
+                blits.append((base, (x, top - HEIGHT), area))
+        target.blits(blits, doreturn=False)
+
+    def prepare(self, theme):
+        """
+        Dựng lớp nền và mọi pha sóng của theme cùng lúc
+        Gọi khi dựng màn chơi để trong lúc chơi (kể cả khi chuyển theme) không phải dựng gì
+        """
+        if theme['name'] not in self.bases:
+            self.bases[theme['name']] = self.build_base(theme)
+        for index in range(self.phase_steps):
+            key = (theme['name'], index)
+            if key in self.frames:
+                self.frames.move_to_end(key)
+                continue
+            self.frames[key] = self.build_frame(theme, index)
+            while len(self.frames) > self.max_frames:
+                self.frames.popitem(last=False)
+
+    def build_base(self, theme):
+        """
+        Lớp nền của theme: màu nền + ảnh nền đã nhân ánh sáng + lớp phủ nước
+        Lớp phủ giống nhau trên cả một hàng nên phủ trước rồi mới dịch theo sóng vẫn cho đúng frame cũ
+        """
+        lit_background, top_layer = self.compositor.bake(theme)
+        base = pygame.Surface((WIDTH, HEIGHT))
+        base.fill(theme['background_color'])
+        if lit_background:
+            base.blit(lit_background, (0, 0))
+        base.blit(top_layer, (0, 0))
+        return base
+
+    def build_frame(self, theme, index):
+        """Các dải (x, y, vùng trên lớp nền) của một pha: các hàng liền nhau cùng độ lệch gộp thành một dải"""
+        if not self.compositor.background:
+            return [(0, 0, pygame.Rect(0, 0, WIDTH, HEIGHT))]
+
+        phase = index * 2 * math.pi / self.phase_steps
+        shifts = [int(6 * math.sin(y/50 + phase) * theme['wave_intensity']) for y in range(0, HEIGHT, 4)]
+        strips = []
+        top = 0
+        for i, shift in enumerate(shifts):
+            if i + 1 < len(shifts) and shifts[i + 1] == shift:
+                continue
+            bottom = min(HEIGHT, (i + 1) * 4)
+            area = pygame.Rect(0, top, WIDTH, bottom - top)
+            strips.append((shift, top, area))
+            # phần bị đẩy ra khỏi một bên màn hình quay vòng sang bên kia
+            if shift > 0:
+                strips.append((shift - WIDTH, top, area))
+            elif shift < 0:
+                strips.append((shift + WIDTH, top, area))
+            top = bottom
+        return strips
+
+    def clear(self):
+        """Xóa toàn bộ frame đã cache"""
+        self.frames.clear()
+        self.bases.clear()
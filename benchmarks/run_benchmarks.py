@@ -0,0 +1,207 @@
+"""
+Benchmark thời gian frame theo kịch bản, chạy headless (SDL_VIDEODRIVER=dummy)
+
+    python benchmarks/run_benchmarks.py [--frames 300] [--warmup 60] [--scenario play_hard ...]
+                                        [--output result.json] [--save-baseline baseline.json]
+                                        [--baseline baseline.json] [--threshold 0.15] [--metric p95]
+
+Mỗi kịch bản báo p50/p95/p99/mean (ms) cho từng phase dưới dạng JSON
+So với baseline: phase nào chậm hơn quá threshold (tỉ lệ) thì báo lỗi và thoát với mã 1
+"""
+import os
+import sys
+import json
+import math
+import random
+import argparse
+import platform
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# stdout chỉ chứa JSON kết quả
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from settings import *
+from perf import PhaseTimer
+
+BENCH_SEED = 1234
+MIN_DELTA_MS = 0.05
+
+class BenchClock:
+    """Clock không ngủ: mỗi tick đúng một bước mô phỏng, kết quả không phụ thuộc FPS của máy"""
+    def __init__(self):
+        self.ticks = 0
+
+    def tick(self, framerate=0):
+        self.ticks += 1
+        return 1000.0 / SIM_HZ
+
+    def get_fps(self):
+        return float(SIM_HZ)
+
+class ScriptedInput:
+    def __init__(self, game, frames, warmup, sweep=True):
+        """
+        Thay cho chuột/bàn phím: chuột quét qua màn hình, QUIT sau warmup + frames frame
+        Số đo của warmup frame đầu (cache còn nguội) bị bỏ
+        """
+        self.game = game
+        self.frames = frames
+        self.warmup = warmup
+        self.sweep = sweep
+        self.count = 0
+
+    def events(self, *args, **kwargs):
+        self.count += 1
+        if self.count == self.warmup:
+            self.game.perf.clear()
+        if self.count >= self.warmup + self.frames:
+            return [pygame.event.Event(pygame.QUIT)]
+        return []
+
+    def mouse_pos(self):
+        if not self.sweep:
+            return (WIDTH // 2, HEIGHT // 2)
+        return (int(WIDTH / 2 + WIDTH * 0.35 * math.sin(self.count * 0.02)),
+                int(HEIGHT * 0.6 + HEIGHT * 0.15 * math.sin(self.count * 0.05)))
+
+def new_play_screen(game, difficulty=DEFAULT_DIFFICULTY, entity_store=ENTITY_STORE):
+    """Ván mới với độ khó và seed cố định: kết quả không phụ thuộc kịch bản nào chạy trước"""
+    from screens.play import PlayScreen
+    screen = PlayScreen(game, difficulty=difficulty, seed=BENCH_SEED, entity_store=entity_store)
+    screen.countdown = 0
+    # không vào game over để kịch bản chạy đủ số frame
+    screen.player.invincible = True
+    return screen
+
+def scenario_start(game, warmup):
+    from screens.start import StartScreen
+    StartScreen(game).run()
+
+def scenario_play(difficulty):
+    def run(game, warmup):
+        new_play_screen(game, difficulty).run()
+    return run
+
+def scenario_transition(game, warmup):
+    screen = new_play_screen(game)
+    # chuyển theme bắt đầu ngay sau warmup
+    screen.theme_manager.theme_timer = screen.theme_manager.theme_duration - warmup * 1000.0 / SIM_HZ
+    screen.run()
+
+def scenario_coin_burst(game, warmup):
+    from screens.entities import Coin
+    screen = new_play_screen(game)
+    for i in range(200):
+        screen.coins.add(Coin(game.coin_img, WIDTH // 2, y=-100 - i * 40, size=SPRITE_SIZES['coin'],
+                              speed=screen.spawner.coin_speed))
+    screen.run()
+
+def scenario_crowd(count):
+    def run(game, warmup):
+        """
+        count obstacle ở xa phía trên màn hình (chưa tới màn hình trong suốt kịch bản), spawner vẫn chạy
+        So crowd_* với nhau: thời gian step / render không được tăng theo count
+        """
+        from screens.entities import Obstacle
+        screen = new_play_screen(game, entity_store=True)
+        rng = random.Random(BENCH_SEED)
+        for _ in range(count):
+            screen.obstacles.add(Obstacle(game.obstacle_imgs[0], rng.randint(0, WIDTH),
+                                          y=rng.randint(-200000, -5000), speed=screen.spawner.obstacle_speed))
+        screen.run()
+    return run
+
+def scenario_gameover(game, warmup):
+    from screens.gameover import GameOverScreen
+    play_screen = new_play_screen(game)
+    play_screen.render(1.0)
+    GameOverScreen(game, play_screen).run()
+    # play_screen.run() không chạy nên phải tự dừng spawner (thread chunk nếu bật)
+    play_screen.sim.close()
+
+SCENARIOS = {
+    "start_bubbles": (scenario_start, True),
+    **{f"play_{difficulty}": (scenario_play(difficulty), True) for difficulty in DIFFICULTY_CONFIGS},
+    "day_night_transition": (scenario_transition, True),
+    "coin_burst": (scenario_coin_burst, False),
+    "gameover": (scenario_gameover, True),
+    **{f"crowd_{count}": (scenario_crowd(count), True) for count in (20, 1000, 5000)},
+}
+
+def run_scenario(game, name, frames, warmup):
+    scenario, sweep = SCENARIOS[name]
+    scripted = ScriptedInput(game, frames, warmup, sweep)
+    pygame.event.get = scripted.events
+    pygame.mouse.get_pos = scripted.mouse_pos
+
+    game.running = True
+    game.perf = PhaseTimer(enabled=True, history=warmup + frames + 1)
+    scenario(game, warmup)
+    return {'frames': len(game.perf.frames), 'phases': game.perf.summary()}
+
+def compare(results, baseline, threshold, metric):
+    """Danh sách (kịch bản, phase, baseline, hiện tại) chậm hơn quá threshold"""
+    regressions = []
+    for name, scenario in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for phase, stats in scenario['phases'].items():
+            old = base['phases'].get(phase, {}).get(metric)
+            if old is None:
+                continue
+            new = stats[metric]
+            if new > old * (1 + threshold) and new - old > MIN_DELTA_MS:
+                regressions.append((name, phase, old, new))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Scenario frame-time benchmarks")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--output")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--metric", choices=("p50", "p95", "p99", "mean"), default="p95")
+    args = parser.parse_args()
+
+    pygame.time.Clock = BenchClock
+    from game import Game
+    game = Game()
+
+    results = {
+        'meta': {
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+        },
+        'scenarios': {},
+    }
+    for name in args.scenario or SCENARIOS:
+        results['scenarios'][name] = run_scenario(game, name, args.frames, args.warmup)
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        for name, phase, old, new in regressions:
+            print(f"REGRESSION {name}/{phase}: {args.metric} {old:.3f} ms -> {new:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No {args.metric} regressions above {args.threshold:.0%}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import pygame
+import random
+import math
+from settings import *
+
+BUBBLE_MIN_SIZE = 5
+BUBBLE_MAX_SIZE = 35
+BUBBLE_MIN_ALPHA = 50
+BUBBLE_MAX_ALPHA = 200
+
+class Bubble:
+    """Hiệu ứng bọt biển dùng chung cho màn hình start và settings"""
+    def __init__(self):
+        self.x = random.randint(0, WIDTH)
+        self.y = HEIGHT + random.randint(0, 300)
+        self.size = random.randint(BUBBLE_MIN_SIZE, BUBBLE_MAX_SIZE)
+        self.speed = random.uniform(0.5, 3.0)
+        self.alpha = random.randint(120, BUBBLE_MAX_ALPHA)
+        self.wobble = random.uniform(0, math.pi * 2)
+        self.wobble_speed = random.uniform(0.01, 0.08)
+        self.pop_time = random.randint(400, 1000)
+        self.age = 0
+
+    def update(self):
+        self.y -= self.speed
+        self.wobble += self.wobble_speed
+        self.x += math.sin(self.wobble) * 1.5
+        self.age += 1
+
+        if self.age > self.pop_time * 0.8:
+            self.alpha = max(BUBBLE_MIN_ALPHA, self.alpha - 3)
+
+        if self.y < -50 or self.age > self.pop_time:
+            self.y = HEIGHT + random.randint(0, 300)
+            self.x = random.randint(0, WIDTH)
+            self.size = random.randint(BUBBLE_MIN_SIZE, BUBBLE_MAX_SIZE)
+            self.speed = random.uniform(0.5, 3.0)
+            self.alpha = random.randint(120, BUBBLE_MAX_ALPHA)
+            self.age = 0
+            self.pop_time = random.randint(400, 1000)
+
+def render_bubble(size, alpha):
+    """Vẽ một bọt biển (size, alpha) lên surface riêng"""
+    bubble_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    center = (size, size)
+
+    shadow_color = (100, 180, 255, alpha // 4)
+    pygame.draw.circle(bubble_surface, shadow_color, (center[0] + 2, center[1] + 2), size)
+
+    for r in range(size, 0, -2):
+        ratio = r / size
+        ring_alpha = int(alpha * (0.8 - ratio * 0.6))
+
+        r_val = int(150 + ratio * 80)
+        g_val = int(220 + ratio * 35)
+        b_val = 255
+
+        color = (r_val, g_val, b_val, ring_alpha)
+        pygame.draw.circle(bubble_surface, color, center, r)
+
+    pygame.draw.circle(bubble_surface, (255, 255, 255, alpha // 2), center, size, 2)
+
+    highlight_pos = (size - size//3, size - size//3)
+    highlight_size = max(2, size//3)
+    pygame.draw.circle(bubble_surface, (255, 255, 255, alpha), highlight_pos, highlight_size)
+
+    small_highlight = (size + size//4, size - size//2)
+    small_size = max(1, size//6)
+    pygame.draw.circle(bubble_surface, (255, 255, 255, alpha // 2), small_highlight, small_size)
+
+    return bubble_surface
+
+class BubbleAtlas:
+    def __init__(self, alpha_step=BUBBLE_ALPHA_STEP):
+        """Vẽ sẵn mọi tổ hợp (size, mức alpha) một lần"""
+        self.alpha_step = max(1, alpha_step)
+        self.max_bucket = BUBBLE_MIN_ALPHA + (BUBBLE_MAX_ALPHA - BUBBLE_MIN_ALPHA) // self.alpha_step * self.alpha_step
+        self.sprites = {}
+        for size in range(BUBBLE_MIN_SIZE, BUBBLE_MAX_SIZE + 1):
+            for alpha in range(BUBBLE_MIN_ALPHA, BUBBLE_MAX_ALPHA + 1, self.alpha_step):
+                self.sprites[(size, alpha)] = render_bubble(size, alpha)
+
+    def get(self, size, alpha):
+        bucket = BUBBLE_MIN_ALPHA + int(round((alpha - BUBBLE_MIN_ALPHA) / self.alpha_step)) * self.alpha_step
+        bucket = max(BUBBLE_MIN_ALPHA, min(bucket, self.max_bucket))
+        return self.sprites[(size, bucket)]
+
+_atlas = None
+
+def get_atlas():
+    """Atlas dùng chung cho cả tiến trình"""
+    global _atlas
+    if _atlas is None:
+        _atlas = BubbleAtlas()
+    return _atlas
+
+def draw_bubbles(surface, bubbles):
+    """Vẽ tất cả bọt biển bằng một lần Surface.blits, trả về các rect đã vẽ"""
+    atlas = get_atlas()
+    return surface.blits([(atlas.get(b.size, b.alpha), (b.x - b.size, b.y - b.size)) for b in bubbles])
@@ -0,0 +1,91 @@
+from bisect import bisect_left, bisect_right
+import pygame
+
+class CollisionLane:
+    __slots__ = ('kind', 'speed', 'keys', 'sprites')
+
+    def __init__(self, kind, speed):
+        """Các sprite cùng loại, cùng tốc độ rơi: thứ tự theo y không đổi khi chúng di chuyển"""
+        self.kind = kind
+        self.speed = speed
+        self.keys = []
+        self.sprites = []
+
+class CollisionWorld:
+    def __init__(self):
+        """
+        Broad phase cho vật thể cuộn dọc
+        Sprite được chia theo (loại, tốc độ); mỗi lane giữ key = rect.top - speed * steps đã sắp xếp,
+        key không đổi khi sprite rơi đều nên không phải sắp lại mỗi bước
+        Chỉ sprite trong dải y của người chơi (bisect) mới test AABB, chỉ AABB chồng mới test mask
+        Yêu cầu: mỗi lần update() sprite rơi đúng int(speed) px và advance() được gọi sau đó
+        """
+        self.lanes = {}
+        self.steps = 0
+        self.max_height = 0
+        self.count = 0
+        self.tests = {'entities': 0, 'aabb': 0, 'mask': 0}
+
+    def add(self, sprite, kind):
+        speed = int(sprite.speed)
+        lane = self.lanes.get((kind, speed))
+        if lane is None:
+            lane = self.lanes[(kind, speed)] = CollisionLane(kind, speed)
+        key = sprite.rect.top - speed * self.steps
+        sprite.collision_key = (kind, speed, key)
+        i = bisect_right(lane.keys, key)
+        lane.keys.insert(i, key)
+        lane.sprites.insert(i, sprite)
+        self.max_height = max(self.max_height, sprite.rect.height)
+        self.count += 1
+
+    def remove(self, sprite):
+        kind, speed, key = sprite.collision_key
+        lane = self.lanes[(kind, speed)]
+        i = bisect_left(lane.keys, key)
+        while lane.sprites[i] is not sprite:
+            i += 1
+        del lane.keys[i]
+        del lane.sprites[i]
+        self.count -= 1
+
+    def advance(self):
+        """Gọi một lần sau mỗi lượt update() các group"""
+        self.steps += 1
+
+    def contacts(self, sprite):
+        """Mọi (kind, sprite) chạm pixel với sprite, trong một lượt"""
+        rect = sprite.rect
+        mask = sprite.mask
+        aabb_tests = mask_tests = 0
+        result = []
+        for lane in self.lanes.values():
+            shift = lane.speed * self.steps
+            first = bisect_left(lane.keys, rect.top - self.max_height - shift)
+            last = bisect_left(lane.keys, rect.bottom - shift)
+            aabb_tests += last - first
+            for other in lane.sprites[first:last]:
+                other_rect = other.rect
+                if not rect.colliderect(other_rect):
+                    continue
+                mask_tests += 1
+                if mask.overlap(other.mask, (other_rect.x - rect.x, other_rect.y - rect.y)):
+                    result.append((lane.kind, other))
+
+        self.tests = {'entities': self.count, 'aabb': aabb_tests, 'mask': mask_tests}
+        return result
+
+class CollisionGroup(pygame.sprite.Group):
+    def __init__(self, world, kind, *sprites):
+        """Group tự đăng ký / gỡ sprite khỏi CollisionWorld với loại kind"""
+        self.world = world
+        self.kind = kind
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.world.add(sprite, self.kind)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.world.remove(sprite)
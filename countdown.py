@@ -0,0 +1,65 @@
+import pygame
+import math
+from settings import *
+from font_registry import fonts
+
+COUNTDOWN_DIGITS = (3, 2, 1)
+
+class CountdownFrames:
+    def __init__(self, phase_steps=COUNTDOWN_PHASE_STEPS):
+        """
+        Frame đếm ngược dựng sẵn theo (theme, chữ số, pha nhịp đập)
+        phase_steps: số pha của nhịp đập trong một chu kỳ
+        """
+        self.phase_steps = max(1, phase_steps)
+        self.frames = {}
+
+    def phase_index(self, ticks):
+        phase = (ticks * 0.01) % (2 * math.pi)
+        return int(round(phase / (2 * math.pi) * self.phase_steps)) % self.phase_steps
+
+    def font_size(self, index):
+        pulse = 1.0 + 0.12 * math.sin(index * 2 * math.pi / self.phase_steps)
+        return int(200 * pulse)
+
+    def font_specs(self):
+        """Các (path, size) mà build_frame dùng, một cỡ chữ cho mỗi pha"""
+        return sorted({(None, self.font_size(index)) for index in range(self.phase_steps)})
+
+    def prepare(self, themes):
+        """Dựng toàn bộ frame cho các theme chưa có"""
+        for theme in themes:
+            if (theme['name'], COUNTDOWN_DIGITS[0], 0) in self.frames:
+                continue
+            for digit in COUNTDOWN_DIGITS:
+                for index in range(self.phase_steps):
+                    self.frames[(theme['name'], digit, index)] = self.build_frame(theme, digit, index)
+
+    def build_frame(self, theme, digit, index):
+        """Ghép glow + bóng + chữ thành một surface, trả về (surface, vị trí)"""
+        size = self.font_size(index)
+        font = fonts.get(None, size)
+        text = font.render(str(digit), True, theme['accent_color'])
+        shadow = font.render(str(digit), True, theme['shadow_color'])
+        rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
+
+        frame = pygame.Surface((rect.width + 40, rect.height + 40), pygame.SRCALPHA)
+        for i in range(20):
+            alpha = int(50 * (1 - i / 20))
+            glow_color = (*theme['accent_color'][:3], alpha)
+            glow_rect = pygame.Rect(i, i, rect.width + 40 - i*2, rect.height + 40 - i*2)
+            pygame.draw.rect(frame, glow_color, glow_rect, border_radius=size//4)
+
+        frame.blit(shadow, (26, 26))
+        frame.blit(text, (20, 20))
+        return frame, (rect.x - 20, rect.y - 20)
+
+    def get(self, theme, digit, ticks):
+        key = (theme['name'], digit, self.phase_index(ticks))
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self.build_frame(theme, digit, key[2])
+            self.frames[key] = frame
+        return frame
+
+countdown_frames = CountdownFrames()
@@ -0,0 +1,50 @@
+import pygame
+from settings import *
+
+class DirtyRectRenderer:
+    def __init__(self, screen, background, enabled=MENU_DIRTY_RECTS):
+        """
+        Vẽ lại theo vùng thay đổi cho các màn hình menu
+        Mọi thứ vẽ trong frame phải được mark() để frame sau khôi phục nền đúng chỗ
+        """
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.screen_rect = screen.get_rect()
+        self.previous = []
+        self.current = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Vẽ lại toàn màn hình ở frame sau (vd. khi quay lại từ màn khác)"""
+        self.full_redraw = True
+
+    def begin(self):
+        """Khôi phục nền dưới các vùng đã vẽ ở frame trước"""
+        if not self.enabled or self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.background, rect, rect)
+        self.current = []
+
+    def mark(self, *rects):
+        """Ghi nhận các vùng vừa vẽ trong frame này"""
+        for rect in rects:
+            if rect:
+                rect = self.screen_rect.clip(rect)
+                if rect.width and rect.height:
+                    self.current.append(rect)
+        return rects[0] if len(rects) == 1 else rects
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        return self.mark(self.screen.blit(source, dest, area, special_flags))
+
+    def present(self):
+        """Đẩy các vùng thay đổi (của frame trước và frame này) ra màn hình"""
+        if not self.enabled or self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
@@ -0,0 +1,188 @@
+import math
+import pygame
+from settings import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class EntityStore:
+    def __init__(self, capacity=64):
+        """
+        Vị trí các entity cuộn dọc dạng mảng NumPy (structure of arrays), mỗi sprite một slot
+        step(): di chuyển, đuổi theo người chơi, hết hạn / ra khỏi màn hình -> kill(), mỗi việc một phép vector
+        rect chỉ được ghi lại cho sprite trong cửa sổ nhìn thấy/va chạm; sprite khác chỉ khi được hỏi
+        (sync_sprites: Spawner trước khi chọn chỗ, sync_all: trước khi cần mọi rect)
+        Vị trí bước trước giữ trong mảng px/py để vẽ nội suy (interpolated): chi phí mỗi bước không có
+        việc Python theo từng sprite ngoài sprite nhìn thấy và sprite bị bỏ
+        Cần numpy (numpy None -> không dùng được, GameSimulation quay về Group.update)
+        """
+        self.kinds = {}
+        self.sprites = []
+        self.free = []
+        self.size = 0
+        self.count = 0
+        self.added = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        old = self.sprites
+        self.sprites = old + [None] * (capacity - len(old))
+
+        def grow(name, dtype, fill=0):
+            array = numpy.full(capacity, fill, dtype=dtype)
+            if old:
+                array[:len(old)] = getattr(self, name)
+            setattr(self, name, array)
+
+        grow('x', numpy.int64)
+        grow('y', numpy.int64)
+        grow('px', numpy.int64)
+        grow('py', numpy.int64)
+        grow('kind', numpy.int16, -1)
+        grow('order', numpy.int64)
+        grow('w', numpy.int64)
+        grow('h', numpy.int64)
+        grow('speed', numpy.int64)
+        grow('cull_bottom', numpy.int64)
+        grow('spawn', numpy.float64)
+        grow('lifetime', numpy.float64, math.inf)
+        grow('homing', numpy.bool_, False)
+        grow('alive', numpy.bool_, False)
+
+    def add(self, sprite, kind):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == len(self.sprites):
+                self.allocate(len(self.sprites) * 2)
+            slot = self.size
+            self.size += 1
+
+        rect = sprite.rect
+        self.sprites[slot] = sprite
+        self.x[slot] = self.px[slot] = rect.x
+        self.y[slot] = self.py[slot] = rect.y
+        self.kind[slot] = self.kinds.setdefault(kind, len(self.kinds))
+        # thứ tự thêm vào: vẽ theo đúng thứ tự của Group (sprite thêm sau vẽ đè lên)
+        self.order[slot] = self.added
+        self.added += 1
+        self.w[slot] = rect.width
+        self.h[slot] = rect.height
+        self.speed[slot] = int(sprite.speed)
+        self.cull_bottom[slot] = HEIGHT + sprite.cull_margin
+        self.homing[slot] = sprite.homing
+        if sprite.lifetime is None:
+            self.lifetime[slot] = math.inf
+        else:
+            self.spawn[slot] = sprite.spawn_time
+            self.lifetime[slot] = sprite.lifetime
+        self.alive[slot] = True
+        sprite.store_slot = slot
+        self.count += 1
+
+    def remove(self, sprite):
+        slot = sprite.store_slot
+        # rect giữ đúng vị trí cuối cùng (chỉ mục spawn còn trỏ tới rect này)
+        sprite.rect.topleft = (int(self.x[slot]), int(self.y[slot]))
+        self.alive[slot] = False
+        self.kind[slot] = -1
+        self.speed[slot] = 0
+        self.homing[slot] = False
+        self.sprites[slot] = None
+        self.free.append(slot)
+        sprite.store_slot = None
+        self.count -= 1
+
+    def step(self, now, target_x, window_top=0, window_bottom=HEIGHT):
+        """
+        Một bước cho mọi entity; target_x: centerx của người chơi (quái vật đuổi theo)
+        Ghi rect cho sprite có phần nằm trong [window_top, window_bottom)
+        """
+        n = self.size
+        if not self.count:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        alive = self.alive[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+        y += self.speed[:n]
+
+        homing = self.homing[:n]
+        if homing.any():
+            dx = target_x - (x + self.w[:n] // 2)
+            move = numpy.minimum(6, numpy.abs(dx) // 8 + 1) * numpy.sign(dx)
+            x += numpy.where(homing, move, 0)
+
+        dead = alive & ((y > self.cull_bottom[:n]) | (now - self.spawn[:n] > self.lifetime[:n]))
+        sync = alive & ~dead & (y < window_bottom) & (y + self.h[:n] > window_top)
+
+        self.write_rects(numpy.flatnonzero(sync))
+        if dead.any():
+            sprites = self.sprites
+            for slot in numpy.flatnonzero(dead).tolist():
+                sprites[slot].kill()
+
+    def write_rects(self, slots):
+        sprites = self.sprites
+        for slot, x, y in zip(slots.tolist(), self.x[slots].tolist(), self.y[slots].tolist()):
+            sprites[slot].rect.topleft = (x, y)
+
+    def sync_sprites(self, sprites):
+        """Ghi rect cho các sprite đã cho (bỏ qua sprite không còn trong store)"""
+        slots = [sprite.store_slot for sprite in sprites if getattr(sprite, 'store_slot', None) is not None]
+        if slots:
+            self.write_rects(numpy.array(slots, dtype=numpy.int64))
+
+    def sync_all(self):
+        self.write_rects(numpy.flatnonzero(self.alive[:self.size]))
+
+    def interpolated(self, kind, alpha, window_top=0, window_bottom=HEIGHT):
+        """
+        (ảnh, x, y) để vẽ các sprite loại kind nằm trong cửa sổ, ở vị trí nội suy giữa bước trước và bước này
+        Cùng công thức làm tròn với vẽ nội suy theo prev_center của sprite thường
+        """
+        kind_id = self.kinds.get(kind)
+        n = self.size
+        if kind_id is None or not self.count:
+            return []
+        y, prev_y, h = self.y[:n], self.py[:n], self.h[:n]
+        # vị trí nội suy nằm giữa py và y: chỉ tính cho sprite có thể nhìn thấy
+        slots = numpy.flatnonzero((self.kind[:n] == kind_id) & (numpy.minimum(y, prev_y) < window_bottom)
+                                  & (numpy.maximum(y, prev_y) + h > window_top))
+        slots = slots[numpy.argsort(self.order[slots])]
+        w = self.w[slots]
+        h = h[slots]
+        prev_x = self.px[slots] + w // 2
+        prev_y = prev_y[slots] + h // 2
+        x = numpy.round(prev_x + (self.x[slots] + w // 2 - prev_x) * alpha - w / 2).astype(numpy.int64)
+        y = numpy.round(prev_y + (y[slots] + h // 2 - prev_y) * alpha - h / 2).astype(numpy.int64)
+        inside = (y < window_bottom) & (y + h > window_top)
+        sprites = self.sprites
+        return [(sprites[slot].image, sx, sy) for slot, sx, sy in
+                zip(slots[inside].tolist(), x[inside].tolist(), y[inside].tolist())]
+
+class StoreGroup(pygame.sprite.Group):
+    def __init__(self, store, kind, world=None, *sprites):
+        """
+        Group tự đăng ký / gỡ sprite khỏi EntityStore (và CollisionWorld nếu có) với loại kind
+        Sprite trong group được store.step() di chuyển, không gọi Group.update()
+        """
+        self.store = store
+        self.kind = kind
+        self.world = world
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if self.world is not None:
+            self.world.add(sprite, self.kind)
+        self.store.add(sprite, self.kind)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if self.world is not None:
+            self.world.remove(sprite)
+        self.store.remove(sprite)
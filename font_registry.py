@@ -0,0 +1,36 @@
+import pygame
+from utils import resource_path
+
+TITLE_FONT = "resources/assets/fonts/ClimateCrisis-Regular-VariableFont_YEAR.ttf"
+
+class FontRegistry:
+    def __init__(self):
+        """Font dùng chung cho cả tiến trình, theo (path, size); path None = font mặc định"""
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, size):
+        key = (path, int(size))
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.misses += 1
+        font = pygame.font.Font(resource_path(path) if path else None, int(size))
+        self.fonts[key] = font
+        return font
+
+    def preload(self, specs):
+        """Mở trước các (path, size) mà màn hình khai báo"""
+        for path, size in specs:
+            key = (path, int(size))
+            if key not in self.fonts:
+                self.misses += 1
+                self.fonts[key] = pygame.font.Font(resource_path(path) if path else None, int(size))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'fonts': len(self.fonts)}
+
+fonts = FontRegistry()
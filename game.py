@@ -4,45 +4,58 @@ from screens.start import StartScreen
 from screens.play import PlayScreen
 from screens.gameover import GameOverScreen
 from screens.settingsscreen import SettingsScreen
-from utils import resource_path
+from ui_manager import UIManager
+from font_registry import fonts
+from asset_manager import AssetManager
+from asset_bundle import AssetBundle, SPRITE_SPECS, SCREEN_SPECS
+from screens.entities import prototypes
+from simulation import load_sprite_images
+from perf import PhaseTimer
+from perf_hud import PerfHud
+
+PRELOAD_ASSETS = [
+    *SPRITE_SPECS,
+    *(path for path, _, _ in SCREEN_SPECS),
+    "resources/assets/sound/sound.mp3",
+]
 
 class Game:
-    def __init__(self):
+    def __init__(self, replay=None, playback_speed=1.0):
+        """replay: InputReplay -> vào thẳng màn chơi và phát lại bản ghi"""
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
+        self.perf = PhaseTimer()
+        self.perf_hud = PerfHud(self)
         self.running = True
-        self.state = "start"
-        
-        self.player_img = pygame.image.load(resource_path("resources/assets/characters/player.png")).convert_alpha()
-        self.player_img = pygame.transform.smoothscale(self.player_img, (120, 120))
+        self.state = "play" if replay else "start"
+        self.replay = replay
+        self.playback_speed = playback_speed
         
-        self.obstacle_imgs = [
-            pygame.image.load(resource_path("resources/assets/backgrounds/1.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/2.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/3.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/4.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/12.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/13.png")).convert_alpha(),
-        ]
+        fonts.preload(StartScreen.FONTS + SettingsScreen.FONTS + PlayScreen.FONTS
+                      + GameOverScreen.FONTS + UIManager.FONTS + PerfHud.FONTS)
 
-        self.obstacle_imgs = [pygame.transform.smoothscale(img, (150, 150)) for img in self.obstacle_imgs]
-        
-        self.coin_img = pygame.image.load(resource_path("resources/assets/backgrounds/11.png")).convert_alpha()
-        self.coin_img = pygame.transform.smoothscale(self.coin_img, (50, 50))
-        
-        self.treasure_img = pygame.image.load(resource_path("resources/assets/backgrounds/5.png")).convert_alpha()
-        self.treasure_img = pygame.transform.smoothscale(self.treasure_img, (100, 100))
-        
-        self.tree_imgs = [
-            pygame.image.load(resource_path("resources/assets/backgrounds/7.png")).convert_alpha(),
-            pygame.image.load(resource_path("resources/assets/backgrounds/8.png")).convert_alpha(),
-        ]
-        self.tree_imgs = [pygame.transform.smoothscale(img, (200, 200)) for img in self.tree_imgs]
-        
-        self.monster_img = pygame.image.load(resource_path("resources/assets/backgrounds/9.png")).convert_alpha()
-        self.monster_img = pygame.transform.smoothscale(self.monster_img, (200, 200))
+        self.assets = AssetManager(bundle=AssetBundle.open())
+        self.assets.preload(PRELOAD_ASSETS)
+
+        images = load_sprite_images(self.assets)
+        self.player_img = images['player']
+        self.obstacle_imgs = images['obstacles']
+        self.coin_img = images['coin']
+        self.treasure_img = images['treasure']
+        self.tree_imgs = images['trees']
+        self.monster_img = images['monster']
+
+        if self.assets.bundle:
+            self.seed_prototypes()
+
+    def seed_prototypes(self):
+        """Nạp sẵn sprite kích thước cuối từ bundle vào cache prototype"""
+        for path, (base_size, final_sizes) in SPRITE_SPECS.items():
+            base = self.assets.image(path, base_size)
+            for size in final_sizes:
+                prototypes.seed(base, size, self.assets.image(path, size))
     
     def run(self):
         start_screen = StartScreen(self)
@@ -55,18 +68,9 @@ class Game:
                 settings_screen.run()
             elif self.state == "play":
 
-                import settings as settings_module
-                difficulty_config = DIFFICULTY_CONFIGS[settings_module.CURRENT_DIFFICULTY]
-                
-                play_screen = PlayScreen(self)
-                
-                play_screen.spawner.obstacle_speed = difficulty_config["obstacle_speed"]
-                play_screen.spawner.coin_speed = difficulty_config["coin_speed"]
-                play_screen.spawner.tree_speed = difficulty_config["tree_speed"]
-                play_screen.spawner.treasure_speed = difficulty_config["treasure_speed"]
-                play_screen.spawner.monster_speed = difficulty_config["monster_speed"]
-                play_screen.spawner.rates = difficulty_config["spawn_rates"]
-                
+                play_screen = PlayScreen(self, self.replay, self.playback_speed)
+                self.replay = None
                 play_screen.run()
         
+        self.assets.close()
         pygame.quit()
@@ -0,0 +1,121 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class GradientCache:
+    def __init__(self, max_entries=GRADIENT_CACHE_SIZE):
+        """
+        Cache LRU các surface gradient đã bo góc
+        key: (kích thước, màu trên, màu dưới, bán kính bo góc, cách nội suy)
+        """
+        self.max_entries = max(1, max_entries)
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, size, color1, color2, radius=0, mode='ratio'):
+        key = (tuple(size), tuple(color1), tuple(color2), radius, mode)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = build_gradient(size, color1, color2, radius, mode)
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+def row_colors(h, color1, color2, mode='ratio'):
+    """
+    Màu RGBA của từng hàng, giữ đúng từng công thức cũ:
+    'floordiv': c1 + (c2 - c1) * i // h
+    'blend':    int(c1 * (1 - t) + c2 * t), t = i / (h - 1)
+    'ratio':    int(c1 + (c2 - c1) * t),    t = i / h
+    Màu không có alpha -> alpha 255 cho mọi hàng (không nội suy)
+    """
+    opaque = len(color1) < 4 and len(color2) < 4
+    c1 = tuple(color1[:3]) if opaque else (*color1[:3], color1[3] if len(color1) > 3 else 255)
+    c2 = tuple(color2[:3]) if opaque else (*color2[:3], color2[3] if len(color2) > 3 else 255)
+    if numpy is not None:
+        start = numpy.array(c1, dtype=numpy.int64)
+        end = numpy.array(c2, dtype=numpy.int64)
+        i = numpy.arange(h, dtype=numpy.int64)[:, None]
+        if mode == 'floordiv':
+            rows = start + (end - start) * i // h
+        elif mode == 'blend':
+            t = i / max(1, h - 1)
+            rows = numpy.trunc(start * (1 - t) + end * t)
+        else:
+            rows = numpy.trunc(start + (end - start) * (i / h))
+        if opaque:
+            rows = numpy.concatenate([rows, numpy.full((h, 1), 255)], axis=1)
+        return rows.astype(numpy.uint8)
+
+    if mode == 'floordiv':
+        rows = [tuple(a + (b - a) * i // h for a, b in zip(c1, c2)) for i in range(h)]
+    elif mode == 'blend':
+        denom = max(1, h - 1)
+        rows = [tuple(int(a * (1 - i / denom) + b * (i / denom)) for a, b in zip(c1, c2)) for i in range(h)]
+    else:
+        rows = [tuple(int(a + (b - a) * (i / h)) for a, b in zip(c1, c2)) for i in range(h)]
+    return [(*row, 255) for row in rows] if opaque else rows
+
+def build_gradient(size, color1, color2, radius=0, mode='ratio'):
+    """Dựng gradient dọc + mask bo góc trong một lượt qua surfarray"""
+    w, h = size
+    surface = pygame.Surface((w, h), pygame.SRCALPHA)
+    if w <= 0 or h <= 0:
+        return surface
+    rows = row_colors(h, color1, color2, mode)
+
+    mask = None
+    if radius:
+        mask = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, w, h), border_radius=radius)
+
+    if numpy is not None:
+        rgb = pygame.surfarray.pixels3d(surface)
+        alpha = pygame.surfarray.pixels_alpha(surface)
+        rgb[:] = rows[None, :, :3]
+        alpha[:] = rows[None, :, 3]
+        if mask is not None:
+            outside = pygame.surfarray.pixels_alpha(mask) == 0
+            rgb[outside] = 0
+            alpha[outside] = 0
+        del rgb, alpha
+        return surface
+
+    for i, color in enumerate(rows):
+        pygame.draw.line(surface, color, (0, i), (w, i))
+    if mask is not None:
+        surface.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+    return surface
+
+def bucket_size(w, h, bucket):
+    """Lượng tử hóa kích thước để các nút co giãn vẫn trúng cache"""
+    if bucket <= 1:
+        return w, h
+    return max(bucket, int(round(w / bucket)) * bucket), max(bucket, int(round(h / bucket)) * bucket)
+
+gradient_cache = GradientCache()
+
+def gradient_rect(rect, size_bucket=1):
+    """Rect mà draw_gradient_rect sẽ vẽ: kích thước đã lượng tử hóa, giữ nguyên tâm (viền vẽ theo rect này)"""
+    rect = pygame.Rect(rect)
+    target = pygame.Rect((0, 0), bucket_size(rect.width, rect.height, size_bucket))
+    target.center = rect.center
+    return target
+
+def draw_gradient_rect(surface, rect, color1, color2, border_radius=0, size_bucket=1):
+    """Vẽ gradient cho button (bỏ qua kênh alpha của màu); trả về rect đã vẽ"""
+    target = gradient_rect(rect, size_bucket)
+    gradient = gradient_cache.get(target.size, color1[:3], color2[:3], border_radius, mode='floordiv')
+    return surface.blit(gradient, target)
@@ -0,0 +1,86 @@
+import pygame
+
+HUD_CHARS = "0123456789,"
+
+class GlyphAtlas:
+    def __init__(self, font, color, chars=HUD_CHARS):
+        """Raster sẵn các ký tự số một lần cho (font, màu)"""
+        self.font = font
+        self.color = color
+        self.height = font.get_height()
+        self.glyphs = {}
+        for ch in chars:
+            self.add_glyph(ch)
+
+    def add_glyph(self, ch):
+        surface = self.font.render(ch, True, self.color)
+        metrics = self.font.metrics(ch)
+        advance = metrics[0][4] if metrics and metrics[0] else surface.get_width()
+        self.glyphs[ch] = (surface, advance)
+        return self.glyphs[ch]
+
+    def measure(self, text):
+        return sum((self.glyphs.get(ch) or self.add_glyph(ch))[1] for ch in text)
+
+    def blit_text(self, target, text, pos):
+        """Ghép chuỗi từ các glyph đã raster"""
+        x, y = pos
+        for ch in text:
+            surface, advance = self.glyphs.get(ch) or self.add_glyph(ch)
+            target.blit(surface, (x, y))
+            x += advance
+
+_atlases = {}
+
+def get_atlas(font, color):
+    """Atlas dùng chung theo (font, màu)"""
+    key = (font, tuple(color))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(font, color)
+        _atlases[key] = atlas
+    return atlas
+
+class HudNumber:
+    def __init__(self, font, color, shadow_color=None, outline_color=None,
+                 shadow_offset=3, outline_width=2):
+        """
+        Số trên HUD (viền + bóng + chữ) ghép sẵn thành một surface
+        Chỉ dựng lại khi giá trị thay đổi
+        """
+        self.fill = get_atlas(font, color)
+        self.shadow = get_atlas(font, shadow_color) if shadow_color else None
+        self.outline = get_atlas(font, outline_color) if outline_color else None
+        self.shadow_offset = shadow_offset if shadow_color else 0
+        self.outline_width = outline_width if outline_color else 0
+        self.value = None
+        self.surface = None
+        self.text_width = 0
+        self.renders = 0
+
+    def get(self, value):
+        """Surface đã ghép và chiều rộng của phần chữ chính"""
+        if value != self.value or self.surface is None:
+            self.value = value
+            self.surface = self.build(f"{value:,}")
+            self.renders += 1
+        return self.surface, self.text_width
+
+    @property
+    def offset(self):
+        """Độ lệch của điểm gốc chữ chính bên trong surface"""
+        return self.outline_width
+
+    def build(self, text):
+        pad = self.outline_width
+        self.text_width = self.fill.measure(text)
+        extra = max(self.outline_width, self.shadow_offset)
+        surface = pygame.Surface((self.text_width + pad + extra, self.fill.height + pad + extra),
+                                 pygame.SRCALPHA)
+        if self.outline:
+            for dx, dy in ((-pad, 0), (pad, 0), (0, -pad), (0, pad)):
+                self.outline.blit_text(surface, text, (pad + dx, pad + dy))
+        if self.shadow:
+            self.shadow.blit_text(surface, text, (pad + self.shadow_offset, pad + self.shadow_offset))
+        self.fill.blit_text(surface, text, (pad, pad))
+        return surface
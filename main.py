@@ -1,5 +1,14 @@
+import sys
 from game import Game
+from recording import InputReplay
 
 if __name__ == "__main__":
-    game = Game()
+    # python main.py --replay recordings/run-....surfrec [--speed 4]
+    replay = None
+    speed = 1.0
+    if "--replay" in sys.argv:
+        replay = InputReplay.load(sys.argv[sys.argv.index("--replay") + 1])
+    if "--speed" in sys.argv:
+        speed = float(sys.argv[sys.argv.index("--speed") + 1])
+    game = Game(replay, speed)
     game.run()
@@ -0,0 +1,106 @@
+import math
+from collections import deque
+from time import perf_counter
+from settings import *
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_PHASE = _NullPhase()
+
+class _Phase:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.timer.current
+        current[self.name] = current.get(self.name, 0.0) + (perf_counter() - self.start) * 1000
+        return False
+
+def percentile(values, q):
+    """Percentile theo nearest-rank trên danh sách đã sắp xếp"""
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), math.ceil(q / 100 * len(values))))
+    return values[rank - 1]
+
+class PhaseTimer:
+    def __init__(self, enabled=PERF_TIMING, history=PERF_HISTORY):
+        """
+        Đo thời gian (ms) từng phase trong mỗi frame, giữ history frame gần nhất
+        Tắt (enabled=False) thì phase() trả về context rỗng dùng chung, gần như không tốn gì
+        """
+        self.enabled = enabled
+        self.frames = deque(maxlen=history)
+        self.current = {}
+        self.phases = {}
+        self.frame_start = 0.0
+        self.last_lap = 0.0
+
+    def phase(self, name):
+        """with timer.phase("draw"): ... -- cộng dồn nếu gọi nhiều lần trong một frame"""
+        if not self.enabled:
+            return NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, name)
+        return phase
+
+    def begin_frame(self):
+        if self.enabled:
+            self.current = {}
+            self.frame_start = self.last_lap = perf_counter()
+
+    def lap(self, name):
+        """Cộng thời gian từ lap trước (hoặc đầu frame) vào phase name"""
+        if self.enabled:
+            now = perf_counter()
+            self.current[name] = self.current.get(name, 0.0) + (now - self.last_lap) * 1000
+            self.last_lap = now
+
+    def end_frame(self):
+        if self.enabled and self.frame_start:
+            self.current['frame'] = (perf_counter() - self.frame_start) * 1000
+            self.frames.append(self.current)
+            self.current = {}
+            self.frame_start = 0.0
+
+    def clear(self):
+        self.frames.clear()
+        self.current = {}
+        self.frame_start = 0.0
+
+    def phase_names(self):
+        names = []
+        for frame in self.frames:
+            for name in frame:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def summary(self):
+        """{phase: {p50, p95, p99, mean}} trên các frame đang giữ"""
+        result = {}
+        for name in self.phase_names():
+            values = sorted(frame[name] for frame in self.frames if name in frame)
+            result[name] = {
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'mean': sum(values) / len(values),
+            }
+        return result
@@ -0,0 +1,116 @@
+import os
+import time
+import pygame
+from settings import *
+from font_registry import fonts
+
+class PerfHud:
+    FONTS = [(None, 22)]
+
+    def __init__(self, game):
+        """
+        Overlay hiệu năng: F3 bật/tắt, F4 ghi ring buffer ra CSV
+        Khi tắt, draw() trả về None ngay và game.perf không đo gì
+        """
+        self.game = game
+        self.visible = False
+        self.rect = pygame.Rect(PERF_HUD_POS, PERF_HUD_SIZE)
+        self.panel = None
+        self.lines = []
+        self.frames_since_refresh = PERF_HUD_REFRESH
+        self.last_dump = None
+
+    def handle_event(self, event):
+        """True nếu phím thuộc về overlay (màn hình không cần xử lý tiếp)"""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.visible = not self.visible
+            self.game.perf.enabled = self.visible or PERF_TIMING
+            self.frames_since_refresh = PERF_HUD_REFRESH
+            return True
+        if event.key == pygame.K_F4:
+            self.last_dump = self.dump_csv()
+            return True
+        return False
+
+    def dump_csv(self, path=None):
+        """Ghi các frame đang giữ (mỗi phase một cột, ms) ra file CSV"""
+        perf = self.game.perf
+        if not perf.frames:
+            return None
+        if path is None:
+            os.makedirs(PERF_DUMP_DIR, exist_ok=True)
+            path = os.path.join(PERF_DUMP_DIR, time.strftime("perf-%Y%m%d-%H%M%S.csv"))
+        names = perf.phase_names()
+        with open(path, "w") as f:
+            f.write(",".join(names) + "\n")
+            for frame in perf.frames:
+                f.write(",".join(f"{frame.get(name, 0.0):.3f}" for name in names) + "\n")
+        print(f"Perf frames written to {path}")
+        return path
+
+    def refresh_text(self, info):
+        """Dựng lại chữ (trung bình 4 * PERF_HUD_REFRESH frame gần nhất)"""
+        font = fonts.get(None, 22)
+        frames = list(self.game.perf.frames)[-PERF_HUD_REFRESH * 4:]
+        lines = []
+        if frames:
+            names = []
+            for frame in frames:
+                names.extend(name for name in frame if name != 'frame' and name not in names)
+            frame_ms = sum(f.get('frame', 0.0) for f in frames) / len(frames)
+            lines.append(f"frame {frame_ms:6.2f} ms   fps {self.game.clock.get_fps():5.1f}")
+            for name in names:
+                ms = sum(f.get(name, 0.0) for f in frames) / len(frames)
+                lines.append(f"{name:<12} {ms:6.2f} ms")
+        else:
+            lines.append("collecting...")
+        for label, value in (info or {}).items():
+            lines.append(f"{label}: {value}")
+        if self.last_dump:
+            lines.append(f"csv: {os.path.basename(self.last_dump)}")
+        self.lines = [font.render(line, True, (230, 255, 230)) for line in lines]
+
+    def draw(self, surface, info=None):
+        """
+        Vẽ overlay; info: dict nhãn -> giá trị (số sprite, tỉ lệ spawn...)
+        Trả về rect đã vẽ, None nếu đang tắt
+        """
+        if not self.visible:
+            return None
+
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= PERF_HUD_REFRESH:
+            self.frames_since_refresh = 0
+            self.refresh_text(info)
+
+        if self.panel is None:
+            self.panel = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        panel = self.panel
+        panel.fill((0, 0, 0, 200))
+
+        y = 8
+        for text in self.lines:
+            panel.blit(text, (10, y))
+            y += text.get_height() + 2
+
+        self.draw_graph(panel, pygame.Rect(10, y + 6, self.rect.width - 20,
+                                           max(20, self.rect.height - y - 14)))
+        return surface.blit(panel, self.rect)
+
+    def draw_graph(self, panel, area):
+        """Đồ thị thời gian frame; vạch ngang = ngân sách 1000/FPS"""
+        pygame.draw.rect(panel, (255, 255, 255, 60), area, 1)
+        scale_ms = 2000.0 / FPS
+        budget_y = area.bottom - int(area.height * 0.5)
+        pygame.draw.line(panel, (255, 200, 0, 160), (area.left, budget_y), (area.right - 1, budget_y))
+
+        frames = list(self.game.perf.frames)[-area.width:]
+        if len(frames) < 2:
+            return
+        points = []
+        for i, frame in enumerate(frames):
+            ms = min(scale_ms, frame.get('frame', 0.0))
+            points.append((area.right - len(frames) + i, area.bottom - 1 - int(ms / scale_ms * (area.height - 2))))
+        pygame.draw.lines(panel, (120, 255, 120), False, points)
@@ -0,0 +1,42 @@
+from settings import *
+
+class EntityPool:
+    def __init__(self, factory, capacity=ENTITY_POOL_CAPACITY):
+        """
+        Pool sprite cho một loại entity
+        factory: lớp entity có reset() cùng tham số với __init__
+        capacity: số sprite rảnh tối đa giữ lại, dư thì bỏ cho GC
+        """
+        self.factory = factory
+        self.capacity = capacity
+        self.free = []
+        self.live = 0
+        self.high_water = 0
+        self.created = 0
+
+    def acquire(self, *args, **kwargs):
+        """Lấy sprite rảnh và reset(), hết thì tạo mới"""
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args, **kwargs)
+        else:
+            sprite = self.factory(*args, **kwargs)
+            self.created += 1
+        sprite.pool = self
+        sprite.pooled = False
+        self.live += 1
+        self.high_water = max(self.high_water, self.live)
+        return sprite
+
+    def release(self, sprite):
+        """Trả sprite về pool (gọi từ kill(), gọi lặp lại không sao)"""
+        if sprite.pooled:
+            return
+        sprite.pooled = True
+        self.live -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+
+    def stats(self):
+        return {'live': self.live, 'free': len(self.free),
+                'high_water': self.high_water, 'created': self.created}
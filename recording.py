@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import struct
+from settings import *
+
+MAGIC = b"SURF"
+VERSION = 4
+HEADER = struct.Struct("<4sBQHBB")
+FLAG_SPAWN_CHUNKS = 1
+
+def zigzag(value):
+    """Số có dấu -> không dấu (0, -1, 1, -2 ... -> 0, 1, 2, 3 ...)"""
+    return (value << 1) ^ (value >> 63)
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varints(data, offset=0):
+    value = shift = 0
+    for byte in data[offset:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+class InputRecorder:
+    def __init__(self, path, seed, difficulty, spawn_chunks=False):
+        """
+        Ghi seed, độ khó, chế độ spawn và mouse x của từng bước mô phỏng
+        Mỗi bước chỉ lưu chênh lệch so với bước trước (zigzag + varint), thường 1 byte
+        """
+        self.path = path
+        self.data = bytearray()
+        name = (difficulty or "").encode("utf-8")
+        flags = FLAG_SPAWN_CHUNKS if spawn_chunks else 0
+        self.data += HEADER.pack(MAGIC, VERSION, seed, SIM_HZ, flags, len(name)) + name
+        self.last_x = 0
+        self.ticks = 0
+
+    def record(self, mouse_x):
+        mouse_x = int(mouse_x)
+        write_varint(self.data, zigzag(mouse_x - self.last_x))
+        self.last_x = mouse_x
+        self.ticks += 1
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+
+class InputReplay:
+    def __init__(self, seed, difficulty, inputs, spawn_chunks=False):
+        """Phát lại input đã ghi: mỗi bước mô phỏng lấy một mouse x"""
+        self.seed = seed
+        self.difficulty = difficulty or None
+        self.spawn_chunks = spawn_chunks
+        self.inputs = inputs
+        self.position = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, sim_hz, flags, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        if version != VERSION:
+            raise ValueError(f"{path} is recording version {version}, this build replays version {VERSION}")
+        if sim_hz != SIM_HZ:
+            raise ValueError(f"{path} was recorded at {sim_hz} Hz, simulation runs at {SIM_HZ} Hz")
+        offset = HEADER.size
+        difficulty = data[offset:offset + name_length].decode("utf-8")
+
+        inputs = []
+        x = 0
+        for delta in read_varints(data, offset + name_length):
+            x += unzigzag(delta)
+            inputs.append(x)
+        return cls(seed, difficulty, inputs, bool(flags & FLAG_SPAWN_CHUNKS))
+
+    def remaining(self):
+        return len(self.inputs) - self.position
+
+    def next_input(self):
+        mouse_x = self.inputs[self.position]
+        self.position += 1
+        return mouse_x
+
+def recording_path(seed):
+    return os.path.join(RECORDINGS_DIR, time.strftime("run-%Y%m%d-%H%M%S") + f"-{seed}.surfrec")
+
+def replay_headless(replay, images):
+    """Chạy lại bản ghi không cần cửa sổ; game over giữa chừng = người chơi đã continue"""
+    from simulation import GameSimulation
+    sim = GameSimulation(images, replay.difficulty, replay.seed, spawn_chunks=replay.spawn_chunks)
+    step_ms = 1000.0 / SIM_HZ
+    while replay.remaining():
+        if sim.game_over:
+            sim.revive()
+        sim.step(step_ms, replay.next_input())
+    sim.close()
+    return sim
+
+if __name__ == "__main__":
+    from asset_manager import AssetManager
+    from simulation import load_sprite_images
+    replay = InputReplay.load(sys.argv[1])
+    sim = replay_headless(replay, load_sprite_images(AssetManager(), convert=False))
+    print(f"seed {replay.seed}, {replay.difficulty}: {sim.steps} steps, score {sim.score}, "
+          f"continues {sim.continue_count}, digest {sim.digest()}")
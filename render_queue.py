@@ -0,0 +1,39 @@
+from operator import itemgetter
+
+class RenderQueue:
+    def __init__(self, target, viewport=None):
+        """
+        Gom (surface, vị trí) của cả frame theo thứ tự z rồi vẽ bằng một lần Surface.blits
+        Sprite nằm hẳn ngoài viewport bị bỏ ngay khi submit
+        """
+        self.target = target
+        self.viewport = viewport or target.get_rect()
+        self.items = []
+        self.submitted = 0
+        self.culled = 0
+
+    def begin(self):
+        self.items = []
+        self.submitted = 0
+        self.culled = 0
+
+    def submit(self, image, x, y, z=0):
+        """Thêm một surface tại (x, y); z nhỏ vẽ trước, cùng z giữ thứ tự submit"""
+        view = self.viewport
+        w, h = image.get_size()
+        if x + w <= view.left or x >= view.right or y + h <= view.top or y >= view.bottom:
+            self.culled += 1
+            return
+        self.items.append((z, image, (x, y)))
+
+    def flush(self):
+        """Vẽ mọi thứ đã submit, trả về số surface đã vẽ"""
+        items = self.items
+        items.sort(key=itemgetter(0))
+        self.target.blits([(image, pos) for _, image, pos in items], doreturn=False)
+        self.submitted = len(items)
+        self.items = []
+        return self.submitted
+
+    def stats(self):
+        return {'submitted': self.submitted, 'culled': self.culled}
@@ -2,12 +2,88 @@ import pygame
 import math
 from settings import *
 
+class RotationTable:
+    def __init__(self, base_img, max_angle=8, step=PLAYER_ROTATION_STEP):
+        """
+        Bảng xoay dựng sẵn: góc lượng tử -> (surface, mask, nửa kích thước)
+        step: độ phân giải góc (độ)
+        """
+        self.max_angle = max_angle
+        self.step = max(0.01, step)
+        self.count = int(round(2 * max_angle / self.step)) + 1
+        self.entries = []
+        for i in range(self.count):
+            angle = -max_angle + i * self.step
+            image = pygame.transform.rotate(base_img, angle)
+            mask = pygame.mask.from_surface(image)
+            offset = (image.get_width() // 2, image.get_height() // 2)
+            self.entries.append((image, mask, offset))
+
+    def lookup(self, angle):
+        """Lấy entry gần nhất với góc"""
+        i = int(round((angle + self.max_angle) / self.step))
+        return self.entries[max(0, min(self.count - 1, i))]
+
+    def stats(self):
+        """Đo bộ nhớ và sai số góc của bảng"""
+        surface_bytes = sum(img.get_width() * img.get_height() * img.get_bytesize()
+                            for img, _, _ in self.entries)
+        mask_bytes = sum((img.get_width() * img.get_height() + 7) // 8
+                         for img, _, _ in self.entries)
+        return {
+            'step': self.step,
+            'entries': self.count,
+            'bytes': surface_bytes + mask_bytes,
+            'max_angle_error': self.step / 2
+        }
+
+def measure_rotation_tables(base_img, steps=(0.25, 0.5, 1.0, 2.0), max_angle=8):
+    """So sánh bộ nhớ / chất lượng giữa các độ phân giải góc"""
+    return [RotationTable(base_img, max_angle, step).stats() for step in steps]
+
+class SpritePrototypeCache:
+    def __init__(self):
+        """Cache dùng chung: (ảnh gốc, kích thước) -> (surface đã scale, mask)"""
+        self.prototypes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_surface, size):
+        """Lấy surface đã scale và mask dùng chung cho mọi instance"""
+        key = (image_surface, tuple(size))
+        prototype = self.prototypes.get(key)
+        if prototype is not None:
+            self.hits += 1
+            return prototype
+
+        self.misses += 1
+        image = pygame.transform.smoothscale(image_surface, size)
+        prototype = (image, pygame.mask.from_surface(image))
+        self.prototypes[key] = prototype
+        return prototype
+
+    def seed(self, image_surface, size, scaled_surface):
+        """Đăng ký sẵn surface đã có kích thước cuối (vd. từ asset bundle)"""
+        self.prototypes[(image_surface, tuple(size))] = (scaled_surface, pygame.mask.from_surface(scaled_surface))
+
+    def stats(self):
+        """Số lần hit/miss và số prototype đang giữ"""
+        return {'hits': self.hits, 'misses': self.misses, 'prototypes': len(self.prototypes)}
+
+    def clear(self):
+        self.prototypes.clear()
+        self.hits = 0
+        self.misses = 0
+
+prototypes = SpritePrototypeCache()
+
 class Player(pygame.sprite.Sprite):
     def __init__(self, image_surface, start_x=WIDTH//2, start_y=-200, target_y=None,
-                 size=(140,140), drop_speed=8):
+                 size=(140,140), drop_speed=8, rotation_step=PLAYER_ROTATION_STEP):
         super().__init__()
 
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+        self.base_img, _ = prototypes.get(image_surface, size)
+        self.rotations = RotationTable(self.base_img, 8, rotation_step)
         self.image = self.base_img
         self.rect = self.image.get_rect(center=(start_x, start_y))
         self.mask = pygame.mask.from_surface(self.image)
@@ -44,80 +120,95 @@ class Player(pygame.sprite.Sprite):
 
             self.angle_timer += dt
             angle = math.sin(self.angle_timer * 0.005) * 8
-            old_center = self.rect.center
-            self.image = pygame.transform.rotate(self.base_img, angle)
-            self.rect = self.image.get_rect(center=old_center)
-            self.mask = pygame.mask.from_surface(self.image)
-
-class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, image_surface, x, y=-220, size=(100,100), speed=6):
+            cx, cy = self.rect.center
+            self.image, self.mask, (ox, oy) = self.rotations.lookup(angle)
+            self.rect = pygame.Rect(cx - ox, cy - oy, self.image.get_width(), self.image.get_height())
+
+class PooledSprite(pygame.sprite.Sprite):
+    pool = None
+    pooled = False
+    cull_margin = 50  # bị bỏ khi rect.top vượt HEIGHT + cull_margin
+    homing = False
+    lifetime = None
+
+    def __init__(self, *args, **kwargs):
+        """Sprite dùng lại được: __init__ chỉ gọi reset(); kill() trả sprite về pool nếu có"""
         super().__init__()
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+        self.reset(*args, **kwargs)
+
+    def kill(self):
+        super().kill()
+        # vị trí nội suy của lượt trước không còn đúng khi sprite được dùng lại
+        self.__dict__.pop('prev_center', None)
+        if self.pool is not None:
+            self.pool.release(self)
+
+class Obstacle(PooledSprite):
+    def reset(self, image_surface, x, y=-220, size=(100,100), speed=6):
+        self.base_img, self.mask = prototypes.get(image_surface, size)
         self.image = self.base_img
         self.rect = self.image.get_rect(center=(x, y))
-        self.mask = pygame.mask.from_surface(self.image)
         self.speed = speed
 
     def update(self, dt, scroll_speed=0):
         self.rect.y += int(self.speed + scroll_speed)
-        if self.rect.top > HEIGHT + 50:
+        if self.rect.top > HEIGHT + self.cull_margin:
             self.kill()
 
-class Coin(pygame.sprite.Sprite):
-    def __init__(self, image_surface, x, y=-100, size=(64,64), speed=6):
-        super().__init__()
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+class Coin(PooledSprite):
+    cull_margin = 20
+
+    def reset(self, image_surface, x, y=-100, size=(64,64), speed=6):
+        self.base_img, self.mask = prototypes.get(image_surface, size)
         self.image = self.base_img
         self.rect = self.image.get_rect(center=(x, y))
-        self.mask = pygame.mask.from_surface(self.image)
         self.speed = speed
 
     def update(self, dt, scroll_speed=0):
         self.rect.y += int(self.speed + scroll_speed)
-        if self.rect.top > HEIGHT + 20:
+        if self.rect.top > HEIGHT + self.cull_margin:
             self.kill()
 
-class Treasure(pygame.sprite.Sprite):
-    def __init__(self, image_surface, x, y=-180, size=(100,100), speed=5):
-        super().__init__()
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+class Treasure(PooledSprite):
+    def reset(self, image_surface, x, y=-180, size=(100,100), speed=5):
+        self.base_img, self.mask = prototypes.get(image_surface, size)
         self.image = self.base_img
         self.rect = self.image.get_rect(center=(x, y))
-        self.mask = pygame.mask.from_surface(self.image)
         self.speed = speed
 
     def update(self, dt, scroll_speed=0):
         self.rect.y += int(self.speed + scroll_speed)
-        if self.rect.top > HEIGHT + 50:
+        if self.rect.top > HEIGHT + self.cull_margin:
             self.kill()
 
-class Tree(pygame.sprite.Sprite):
-    def __init__(self, image_surface, x, y=-200, size=(100,100), speed=6):
-        super().__init__()
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+class Tree(PooledSprite):
+    def reset(self, image_surface, x, y=-200, size=(100,100), speed=6):
+        self.base_img, self.mask = prototypes.get(image_surface, size)
         self.image = self.base_img
         self.rect = self.image.get_rect(center=(x, y))
-        self.mask = pygame.mask.from_surface(self.image)
         self.speed = speed
         self.called_monster = False
 
     def update(self, dt, scroll_speed=0):
         self.rect.y += int(self.speed + scroll_speed)
-        if self.rect.top > HEIGHT + 50:
+        if self.rect.top > HEIGHT + self.cull_margin:
             self.kill()
 
-class Monster(pygame.sprite.Sprite):
-    def __init__(self, image_surface, player_sprite, spawn_x=None, spawn_y=-250,
-                 size=(240,240), speed=5):
-        super().__init__()
-        self.base_img = pygame.transform.smoothscale(image_surface, size)
+class Monster(PooledSprite):
+    cull_margin = 200
+    homing = True
+    lifetime = 60_000
+
+    def reset(self, image_surface, player_sprite, spawn_x=None, spawn_y=-250,
+              size=(240,240), speed=5, clock=None):
+        self.base_img, self.mask = prototypes.get(image_surface, size)
         self.image = self.base_img
         px = player_sprite.rect.centerx if spawn_x is None else spawn_x
         self.rect = self.image.get_rect(midbottom=(px, spawn_y))
-        self.mask = pygame.mask.from_surface(self.image)
         self.speed = speed
         self.player = player_sprite
-        self.spawn_time = pygame.time.get_ticks()
+        self.clock = clock or pygame.time.get_ticks
+        self.spawn_time = self.clock()
 
     def update(self, dt, scroll_speed=0):
         self.rect.y += int(self.speed + scroll_speed)
@@ -127,8 +218,8 @@ class Monster(pygame.sprite.Sprite):
         elif self.player.rect.centerx > self.rect.centerx:
             self.rect.x += min(6, (self.player.rect.centerx - self.rect.centerx) // 8 + 1)
 
-        if pygame.time.get_ticks() - self.spawn_time > 60_000:
+        if self.clock() - self.spawn_time > self.lifetime:
             self.kill()
 
-        if self.rect.top > HEIGHT + 200:
+        if self.rect.top > HEIGHT + self.cull_margin:
             self.kill()
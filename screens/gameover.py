@@ -1,21 +1,11 @@
 import pygame
 from settings import *
+from gradients import gradient_cache
+from font_registry import fonts
 
 def draw_rounded_gradient_rect(surface, rect, color1, color2, radius=18, border=4, border_color=(0,0,0)):
     x, y, w, h = rect
-    grad = pygame.Surface((w, h), pygame.SRCALPHA)
-
-    for i in range(h):
-        ratio = i / max(1, h - 1)
-        r = int(color1[0]*(1-ratio) + color2[0]*ratio)
-        g = int(color1[1]*(1-ratio) + color2[1]*ratio)
-        b = int(color1[2]*(1-ratio) + color2[2]*ratio)
-        pygame.draw.line(grad, (r, g, b), (0, i), (w, i))
-
-    mask = pygame.Surface((w, h), pygame.SRCALPHA)
-    pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, w, h), border_radius=radius)
-
-    grad.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    grad = gradient_cache.get((w, h), color1[:3], color2[:3], radius, mode='blend')
 
     surface.blit(grad, (x, y))
 
@@ -23,20 +13,34 @@ def draw_rounded_gradient_rect(surface, rect, color1, color2, radius=18, border=
         pygame.draw.rect(surface, border_color, rect, border, border_radius=radius)
 
 class GameOverScreen:
+    FONTS = [(None, 110), (None, 48), (None, 46)]
+
     def __init__(self, game, play_screen):
         self.game = game
         self.play_screen = play_screen
+        self.perf = game.perf
         self.continue_count = getattr(play_screen, "continue_count", 0)
+        fonts.preload(self.FONTS)
         self.buttons = {}
         self.create_buttons()
+        self.prerender_buttons()
+
+        self.title_font = fonts.get(None, 110)
+        self.popup_font = fonts.get(None, 46)
 
         self.popup_text = None
         self.popup_timer = 0
         self.popup_duration = 1500
         self.popup_alpha = 255
+        self.popup_surfaces = None
+        self.popup_rect = None
+
+        self.base_frame = None
+        self.frame = None
+        self.perf_hud_drawn = False
 
     def create_buttons(self):
-        font = pygame.font.Font(None, 48)
+        font = fonts.get(None, 48)
         btn_w, btn_h = 320, 85
         spacing = 30
         start_y = HEIGHT * 0.55
@@ -56,9 +60,9 @@ class GameOverScreen:
                 "text": font.render(name, True, (0, 0, 0))
             }
 
-    def draw_button(self, screen, name, hover=False, disabled=False):
+    def draw_button(self, screen, name, hover=False, disabled=False, rect=None):
         button = self.buttons[name]
-        rect = button["rect"]
+        rect = rect or button["rect"]
         c1, c2 = button["colors"]
 
         if hover and not disabled:
@@ -76,38 +80,101 @@ class GameOverScreen:
         text = button["text"]
         screen.blit(text, text.get_rect(center=rect.center))
 
+    def prerender_buttons(self):
+        """Render every button state (normal / hover / disabled) once."""
+        for name, button in self.buttons.items():
+            local_rect = pygame.Rect((0, 0), button["rect"].size)
+            button["states"] = {}
+            for state in ("normal", "hover", "disabled"):
+                surf = pygame.Surface(local_rect.size, pygame.SRCALPHA)
+                self.draw_button(surf, name, state == "hover", state == "disabled", local_rect)
+                button["states"][state] = surf
+            button["state"] = None
+
+    def compose_frame(self, gameplay_snapshot):
+        """Composite the dimmed snapshot and the title once when the screen opens."""
+        self.base_frame = gameplay_snapshot.copy()
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        self.base_frame.blit(overlay, (0, 0))
+
+        text = self.title_font.render("GAME OVER", True, (255, 50, 50))
+        shadow = self.title_font.render("GAME OVER", True, (0, 0, 0))
+        rect = text.get_rect(center=(WIDTH//2, HEIGHT * 0.3))
+        self.base_frame.blit(shadow, (rect.x + 5, rect.y + 5))
+        self.base_frame.blit(text, rect)
+
+        self.frame = self.base_frame.copy()
+        for button in self.buttons.values():
+            button["state"] = None
+
+    def update_button(self, name, state):
+        """Redraw a button into the frame only when its state changed; return the dirty rect."""
+        button = self.buttons[name]
+        if button["state"] == state:
+            return None
+        button["state"] = state
+        rect = button["rect"]
+        self.frame.blit(self.base_frame, rect, rect)
+        self.frame.blit(button["states"][state], rect)
+        return self.game.screen.blit(self.frame, rect, rect)
+
     def draw_popup(self, screen, dt):
-        """Display popup notification (fade out)."""
+        """Display popup notification (fade out); return the dirty rect."""
         if self.popup_text:
             self.popup_timer += dt
             if self.popup_timer > self.popup_duration:
                 self.popup_text = None
                 self.popup_timer = 0
                 self.popup_alpha = 255
-                return
+                return screen.blit(self.frame, self.popup_rect, self.popup_rect)
 
             if self.popup_timer > self.popup_duration * 0.7:
                 self.popup_alpha = int(255 * (1 - (self.popup_timer - self.popup_duration * 0.7) / (self.popup_duration * 0.3)))
 
-            font = pygame.font.Font(None, 46)
-            text_surf = font.render(self.popup_text, True, (255, 255, 255))
+            if self.popup_surfaces is None:
+                text_surf = self.popup_font.render(self.popup_text, True, (255, 255, 255))
+                bg = pygame.Surface((text_surf.get_width() + 40, text_surf.get_height() + 20), pygame.SRCALPHA)
+                bg.fill((0, 0, 0, 180))
+                self.popup_surfaces = (bg, text_surf)
+                popup_rect = bg.get_rect(center=(WIDTH//2, HEIGHT//2))
+                self.popup_rect = popup_rect.union(self.popup_rect) if self.popup_rect else popup_rect
+
+            bg, text_surf = self.popup_surfaces
             text_surf.set_alpha(self.popup_alpha)
-            bg = pygame.Surface((text_surf.get_width() + 40, text_surf.get_height() + 20), pygame.SRCALPHA)
-            bg.fill((0, 0, 0, 180))
+            screen.blit(self.frame, self.popup_rect, self.popup_rect)
             screen.blit(bg, (WIDTH//2 - bg.get_width()//2, HEIGHT//2 - bg.get_height()//2))
             screen.blit(text_surf, (WIDTH//2 - text_surf.get_width()//2, HEIGHT//2 - text_surf.get_height()//2))
+            return self.popup_rect
+        return None
+
+    def draw_perf_hud(self, screen):
+        """Draw the perf overlay over the frame; clear it once after it is hidden."""
+        hud = self.game.perf_hud
+        if not hud.visible and not self.perf_hud_drawn:
+            return None
+        screen.blit(self.frame, hud.rect, hud.rect)
+        hud.draw(screen)
+        self.perf_hud_drawn = hud.visible
+        return hud.rect
 
     def run(self):
         running = True
-        gameplay_snapshot = self.game.screen.copy()
+        self.compose_frame(self.game.screen)
+        self.game.screen.blit(self.frame, (0, 0))
+        full_redraw = True
         clock = pygame.time.Clock()
 
         while running:
             dt = clock.tick(FPS)
+            self.perf.begin_frame()
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
+            dirty = []
 
             for event in pygame.event.get():
+                if self.game.perf_hud.handle_event(event):
+                    continue
                 if event.type == pygame.QUIT:
                     self.game.running = False
                     running = False
@@ -123,24 +190,14 @@ class GameOverScreen:
                         running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     mouse_click = True
-
-            self.game.screen.blit(gameplay_snapshot, (0, 0))
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 160))
-            self.game.screen.blit(overlay, (0, 0))
-
-            font_big = pygame.font.Font(None, 110)
-            text = font_big.render("GAME OVER", True, (255, 50, 50))
-            shadow = font_big.render("GAME OVER", True, (0, 0, 0))
-            rect = text.get_rect(center=(WIDTH//2, HEIGHT * 0.3))
-            self.game.screen.blit(shadow, (rect.x + 5, rect.y + 5))
-            self.game.screen.blit(text, rect)
+            self.perf.lap("events")
 
             for name, button in self.buttons.items():
                 rect = button["rect"]
                 hover = rect.collidepoint(mouse_pos)
                 disabled = (name == "Continue" and self.continue_count >= 2)
-                self.draw_button(self.game.screen, name, hover, disabled)
+                state = "disabled" if disabled else ("hover" if hover else "normal")
+                dirty.append(self.update_button(name, state))
 
                 if hover and mouse_click and not disabled:
                     if name == "Restart":
@@ -153,12 +210,24 @@ class GameOverScreen:
                         self.handle_back_to_menu()
                         running = False
 
-            self.draw_popup(self.game.screen, dt)
+            dirty.append(self.draw_popup(self.game.screen, dt))
+            dirty.append(self.draw_perf_hud(self.game.screen))
+            self.perf.lap("draw")
 
-            pygame.display.flip()
+            if full_redraw:
+                pygame.display.flip()
+                full_redraw = False
+            else:
+                dirty = [rect for rect in dirty if rect]
+                if dirty:
+                    pygame.display.update(dirty)
+            self.perf.lap("flip")
+            self.perf.end_frame()
 
     def handle_restart(self):
         from screens.play import PlayScreen
+        # the finished run is not resumed: stop its spawner thread before the new one starts
+        self.play_screen.sim.close()
         play_screen = PlayScreen(self.game)
         self.game.state = "play"
         play_screen.run()
@@ -172,9 +241,7 @@ class GameOverScreen:
         remaining = 2 - self.continue_count
         self.show_popup(f"You have {remaining} continue(s) left.")
 
-        self.play_screen.continue_count = self.continue_count
-        self.play_screen.invincible_timer = 3000
-        self.play_screen.invincible_blink_timer = 0
+        self.play_screen.sim.revive(invincible_ms=3000)
         self.game.state = "play"
         self.play_screen.run()
         return True
@@ -185,6 +252,7 @@ class GameOverScreen:
     def show_popup(self, message):
         """Display popup text."""
         self.popup_text = message
+        self.popup_surfaces = None
         self.popup_timer = 0
         self.popup_alpha = 255
         self.popup_duration = 1500
@@ -1,148 +1,161 @@
 import pygame
-import math
 from settings import *
-from screens.entities import Player
-from screens.spawner import Spawner
+from simulation import GameSimulation
+from recording import InputRecorder, recording_path
 from theme_manager import ThemeManager
 from ui_manager import UIManager
-from utils import resource_path
+from font_registry import fonts
+from countdown import countdown_frames
+from background import LayerCompositor, WaveFrameCache
+from render_queue import RenderQueue
+from entity_store import StoreGroup
 
 class PlayScreen:
-    def __init__(self, game):
+    FONTS = countdown_frames.font_specs()
+
+    def __init__(self, game, replay=None, playback_speed=1.0, difficulty=None, seed=None,
+                 entity_store=ENTITY_STORE):
         """
         Màn chơi chính (PlayScreen)
         game: object chứa ít nhất
           - screen, clock
           - images: obstacle_imgs, coin_img, treasure_img, tree_imgs, monster_img, player_img
+        replay: InputReplay -> chạy lại bản ghi thay vì đọc chuột
+        playback_speed: hệ số tốc độ phát lại (không ảnh hưởng kết quả mô phỏng)
+        difficulty, seed: cho ván mới (None -> CURRENT_DIFFICULTY trong settings, seed ngẫu nhiên)
+        entity_store: di chuyển và vẽ entity bằng EntityStore (xem GameSimulation)
         """
         self.game = game
         self.screen = game.screen
         self.clock = game.clock
 
-        self.theme_manager = ThemeManager()
+        fonts.preload(self.FONTS)
+        self.theme_manager = ThemeManager(getattr(game, 'assets', None))
         self.ui_manager = UIManager(self.theme_manager)
         
-        self.background = pygame.image.load(resource_path("resources/assets/backgrounds/test.jpg")).convert()
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = self.theme_manager.get_background_image((WIDTH, HEIGHT))
+        if not hasattr(game, 'wave_cache'):
+            game.wave_cache = WaveFrameCache(LayerCompositor(self.background))
+        self.wave_cache = game.wave_cache
+        # dựng sẵn frame sóng của cả theme hiện tại lẫn theme sắp chuyển tới
+        self.wave_cache.prepare(self.theme_manager.get_current_theme())
+        self.wave_cache.prepare(self.theme_manager.get_next_theme())
+        # frame nền của theme sắp tới khi đang chuyển theme (tạo khi cần)
+        self.transition_surface = None
         self.wave_offset = 0
         self.scroll_y = 0
+        self.scroll_speed = 4
 
         self.back_button = pygame.Rect(30, 30, 60, 60)
-        self.back_icon = pygame.image.load(resource_path("resources/assets/icon/return_icon.png")).convert_alpha()
-        self.back_icon = pygame.transform.smoothscale(self.back_icon, (32, 32))
-
-        self.countdown = 3
-        self.countdown_timer = 0
-
-        self.obstacles = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()
-        self.treasures = pygame.sprite.Group()
-        self.trees = pygame.sprite.Group()
-        self.monsters = pygame.sprite.Group()
-
-        groups = {
-            'obstacles': self.obstacles,
-            'coins': self.coins,
-            'treasures': self.treasures,
-            'trees': self.trees,
-            'monsters': self.monsters
-        }
+        self.back_icon = game.assets.image("resources/assets/icon/return_icon.png", (32, 32))
+
+        countdown_frames.prepare(self.theme_manager.themes.values())
 
+        import settings as settings_module
         images = {
+            'player': getattr(game, 'player_img', None),
             'obstacles': getattr(game, 'obstacle_imgs', []),
             'coin': getattr(game, 'coin_img', None),
             'treasure': getattr(game, 'treasure_img', None),
             'trees': getattr(game, 'tree_imgs', []),
             'monster': getattr(game, 'monster_img', None)
         }
-
-        player_img = getattr(game, 'player_img', resource_path("resources/assets/characters/player.png"))
-        self.player = Player(player_img,
-                             start_x=WIDTH//2, start_y=-200,
-                             target_y=int(HEIGHT*0.62),
-                             size=(150,150), drop_speed=20)
-        self.player_group = pygame.sprite.GroupSingle(self.player)
-
-        self.spawner = Spawner(game, groups, images)
-        
+        self.replay = replay
+        self.playback_speed = playback_speed
+        if replay:
+            self.sim = GameSimulation(images, replay.difficulty, replay.seed, entity_store,
+                                      spawn_chunks=replay.spawn_chunks)
+        else:
+            self.sim = GameSimulation(images, difficulty or settings_module.CURRENT_DIFFICULTY, seed,
+                                      entity_store)
+        self.recorder = None
+        if RECORD_RUNS and not replay:
+            self.recorder = InputRecorder(recording_path(self.sim.seed), self.sim.seed, self.sim.difficulty,
+                                          self.sim.spawner.chunks)
+
+        self.player = self.sim.player
+        self.player_group = self.sim.player_group
+        self.spawner = self.sim.spawner
+        self.obstacles = self.sim.obstacles
+        self.coins = self.sim.coins
+        self.treasures = self.sim.treasures
+        self.trees = self.sim.trees
+        self.monsters = self.sim.monsters
+        self.sprite_groups = (self.obstacles, self.coins, self.treasures,
+                              self.trees, self.monsters, self.player_group)
+        # thứ tự vẽ (z tăng dần)
+        self.draw_order = (self.obstacles, self.trees, self.coins,
+                           self.treasures, self.monsters, self.player_group)
+        self.render_queue = RenderQueue(self.screen)
+        self.store = self.sim.store
+        self.tracked_groups = tuple(group for group in self.sprite_groups if not isinstance(group, StoreGroup))
+
+        self.perf = getattr(game, 'perf', self.sim.perf)
+        self.sim.perf = self.perf
         self.running = False
-        self.score = 0
 
-        self.invincible_timer = 0
-        self.invincible_blink_timer = 0
-        
         try:
-            pygame.mixer.music.load(resource_path("resources/assets/sound/sound.mp3"))
-
-            import settings as settings_module
-            pygame.mixer.music.set_volume(settings_module.CURRENT_VOLUME)
-            pygame.mixer.music.play(-1)
+            game.assets.play_music("resources/assets/sound/sound.mp3", settings_module.CURRENT_VOLUME)
         except pygame.error as e:
             print(f"Cannot load PlayScreen music: {e}")
 
-    def draw_background(self):
+    @property
+    def score(self):
+        return self.sim.score
+
+    @property
+    def countdown(self):
+        return self.sim.countdown
+
+    @countdown.setter
+    def countdown(self, value):
+        self.sim.countdown = value
+
+    @property
+    def invincible_timer(self):
+        return self.sim.invincible_timer
+
+    @invincible_timer.setter
+    def invincible_timer(self, value):
+        self.sim.invincible_timer = value
+
+    @property
+    def invincible_blink_timer(self):
+        return self.sim.invincible_blink_timer
+
+    @invincible_blink_timer.setter
+    def invincible_blink_timer(self, value):
+        self.sim.invincible_blink_timer = value
+
+    @property
+    def continue_count(self):
+        return self.sim.continue_count
+
+    @continue_count.setter
+    def continue_count(self, value):
+        self.sim.continue_count = value
+
+    def draw_background(self, alpha=0.0):
         """Vẽ nền với hiệu ứng sóng ngang + cuộn dọc và theme"""
         theme = self.theme_manager.get_current_theme()
-        
-        background_surface = pygame.Surface((WIDTH, HEIGHT))
-        background_surface.fill(theme['background_color'])
-        
-        if self.background:
-
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((255, 255, 255, int(255 * theme['ambient_light'])))
-            
-            wave_surface = pygame.Surface((WIDTH, HEIGHT))
-            for y in range(0, HEIGHT, 4):
-                shift = int(6 * math.sin(y/50 + self.wave_offset*0.01) * theme['wave_intensity'])
-                line = self.background.subsurface((0, y, WIDTH, 4))
-                wave_surface.blit(line, (shift, y))
-                if shift > 0:
-                    wave_surface.blit(line, (shift-WIDTH, y))
-                elif shift < 0:
-                    wave_surface.blit(line, (shift+WIDTH, y))
-            
-            wave_surface.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-            background_surface.blit(wave_surface, (0, 0))
-        
-        water_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        for y in range(0, HEIGHT, 4):
-            alpha = int(80 * (1 - y / HEIGHT))
-            water_color = (*theme['water_color'][:3], alpha)
-            pygame.draw.line(water_overlay, water_color, (0, y), (WIDTH, y))
-        
-        background_surface.blit(water_overlay, (0, 0))
-        
-        if theme['name'] == "Đêm":
-            dark_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            dark_overlay.fill((0, 0, 0, 100))
-            background_surface.blit(dark_overlay, (0, 0))
-        
-        sy = self.scroll_y % HEIGHT
-        self.screen.blit(background_surface, (0, sy-HEIGHT))
-        self.screen.blit(background_surface, (0, sy))
+        sy = int(self.scroll_y + self.scroll_speed * alpha) % HEIGHT
+        self.wave_cache.draw(self.screen, theme, self.wave_offset, sy)
+
+        progress = self.theme_manager.get_transition_progress()
+        if progress > 0:
+            if self.transition_surface is None:
+                self.transition_surface = pygame.Surface((WIDTH, HEIGHT))
+            next_theme = self.theme_manager.get_next_theme()
+            self.wave_cache.draw(self.transition_surface, next_theme, self.wave_offset, sy)
+            self.transition_surface.set_alpha(int(255 * min(1.0, progress)))
+            self.screen.blit(self.transition_surface, (0, 0))
 
     def draw_countdown(self):
         """Vẽ đồng hồ đếm ngược với theme"""
         if self.countdown > 0:
             theme = self.theme_manager.get_current_theme()
-            pulse = 1.0 + 0.12 * math.sin(pygame.time.get_ticks() * 0.01)
-            size = int(200 * pulse)
-            font = pygame.font.Font(None, size)
-            text = font.render(str(self.countdown), True, theme['accent_color'])
-            shadow = font.render(str(self.countdown), True, theme['shadow_color'])
-            rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
-            
-            glow_surface = pygame.Surface((rect.width + 40, rect.height + 40), pygame.SRCALPHA)
-            for i in range(20):
-                alpha = int(50 * (1 - i / 20))
-                glow_color = (*theme['accent_color'][:3], alpha)
-                glow_rect = pygame.Rect(i, i, rect.width + 40 - i*2, rect.height + 40 - i*2)
-                pygame.draw.rect(glow_surface, glow_color, glow_rect, border_radius=size//4)
-            
-            self.screen.blit(glow_surface, (rect.x - 20, rect.y - 20))
-            self.screen.blit(shadow, (rect.x+6, rect.y+6))
-            self.screen.blit(text, rect)
+            frame, pos = countdown_frames.get(theme, self.countdown, pygame.time.get_ticks())
+            self.screen.blit(frame, pos)
 
     def draw_score(self):
         """Vẽ điểm số với UI mới"""
@@ -150,69 +163,128 @@ class PlayScreen:
         self.ui_manager.draw_coin_panel(self.screen, self.player.coins_collected)
         self.ui_manager.draw_theme_indicator(self.screen)
 
-    def handle_collisions(self):
-        """Xử lý va chạm & luật chơi"""
-        
-        coins_hit = pygame.sprite.spritecollide(
-            self.player, self.coins, dokill=True, collided=pygame.sprite.collide_mask
-        )
-        if coins_hit:
-            self.player.coins_collected += len(coins_hit)
-            self.score += int(5 * len(coins_hit) * self.player.score_multiplier)
-
-            for coin in coins_hit:
-                self.ui_manager.add_coin_collect_effect(coin.rect.centerx, coin.rect.centery)
-        
-        if self.invincible_timer > 0 or self.player.invincible:
-
-            trees_hit = pygame.sprite.spritecollide(
-                self.player, self.trees, dokill=False, collided=pygame.sprite.collide_mask
-            )
-            for t in trees_hit:
-                if not getattr(t, 'called_monster', False):
-                    t.called_monster = True
-                    self.spawner.spawn_monster_from_tree(t, self.player)
-            return False
-        
-        if pygame.sprite.spritecollideany(
-            self.player, self.obstacles, collided=pygame.sprite.collide_mask
-        ):
-            self.game.state = "game_over"
-            return True
-        
-        trees_hit = pygame.sprite.spritecollide(
-            self.player, self.trees, dokill=False, collided=pygame.sprite.collide_mask
-        )
-        for t in trees_hit:
-            if not getattr(t, 'called_monster', False):
-                t.called_monster = True
-                self.spawner.spawn_monster_from_tree(t, self.player)
-        
-        if pygame.sprite.spritecollideany(
-            self.player, self.monsters, collided=pygame.sprite.collide_mask
-        ):
-            self.game.state = "game_over"
-            return True
-        
-        return False
+    def step(self, dt, mouse_pos):
+        """
+        Một bước mô phỏng cố định (dt = 1000 / SIM_HZ)
+        Trả về True nếu người chơi va chạm (game over)
+        """
+        self.wave_offset += 5
+        self.scroll_y += self.scroll_speed
 
-    def run(self):
-        self.running = True
-        while self.running and self.game.running:
-            dt = self.clock.tick(FPS)
-            self.wave_offset += 5  
-            self.scroll_y += 4  
-            
+        with self.perf.phase("update"):
             self.theme_manager.update(dt)
             self.ui_manager.update(dt)
 
-            if self.countdown > 0:
-                self.countdown_timer += dt
-                if self.countdown_timer >= 1000:
-                    self.countdown -= 1
-                    self.countdown_timer = 0
+        # sprite trong EntityStore đã có vị trí bước trước trong mảng px/py của store
+        for group in self.tracked_groups:
+            for sprite in group:
+                sprite.prev_center = sprite.rect.center
+
+        if self.replay:
+            if not self.replay.remaining():
+                self.game.state = "start"
+                self.running = False
+                return False
+            if self.sim.game_over:
+                # bản ghi còn tiếp sau game over nghĩa là người chơi đã continue
+                self.sim.revive()
+            mouse_x = self.replay.next_input()
+        else:
+            mouse_x = mouse_pos[0]
+            if self.recorder:
+                self.recorder.record(mouse_x)
+
+        collided = False
+        for event in self.sim.step(dt, mouse_x):
+            if event[0] == 'coin':
+                self.ui_manager.add_coin_collect_effect(event[1], event[2])
+            elif event[0] == 'game_over' and not self.replay:
+                self.game.state = "game_over"
+                collided = True
+        return collided
+
+    def queue_interpolated(self, group, alpha, z):
+        """Đưa sprite vào render queue tại vị trí nội suy giữa bước mô phỏng trước và bước hiện tại"""
+        submit = self.render_queue.submit
+        if isinstance(group, StoreGroup):
+            visible = self.store.interpolated(group.kind, alpha)
+            # store đã bỏ sẵn sprite ngoài màn hình theo trục y
+            self.render_queue.culled += len(group) - len(visible)
+            for image, x, y in visible:
+                submit(image, x, y, z)
+            return
+        for sprite in group:
+            rect = sprite.rect
+            px, py = getattr(sprite, 'prev_center', rect.center)
+            x = px + (rect.centerx - px) * alpha - rect.width / 2
+            y = py + (rect.centery - py) * alpha - rect.height / 2
+            submit(sprite.image, round(x), round(y), z)
+
+    def render(self, alpha):
+        """Vẽ một frame; alpha là phần dư của accumulator (0..1) giữa hai bước mô phỏng"""
+        with self.perf.phase("background"):
+            self.draw_background(alpha)
+
+        with self.perf.phase("draw"):
+            self.render_queue.begin()
+            for z, group in enumerate(self.draw_order):
+                self.queue_interpolated(group, alpha, z)
+
+            if self.invincible_timer > 0 and int(self.invincible_blink_timer / 150) % 2 == 0:
+                self.player.image.set_alpha(80)
+            else:
+                self.player.image.set_alpha(255)
+            self.render_queue.flush()
+
+        with self.perf.phase("hud"):
+            self.draw_countdown()
+            self.draw_score()
+
+            self.theme_manager.draw_transition_effects(self.screen)
+
+            self.ui_manager.draw_coin_collect_effects(self.screen)
+
+            mouse_pos = pygame.mouse.get_pos()
+            self.ui_manager.draw_control_buttons(self.screen, mouse_pos)
+
+        if self.game.perf_hud.visible:
+            self.game.perf_hud.draw(self.screen, self.perf_info())
+
+    def perf_info(self):
+        """Số sprite từng group và tỉ lệ spawn đo được cho overlay hiệu năng"""
+        counts = " ".join(f"{name} {len(group)}" for name, group in (
+            ("obs", self.obstacles), ("coin", self.coins), ("treasure", self.treasures),
+            ("tree", self.trees), ("monster", self.monsters)))
+        observed = self.spawner.observed_rates()
+        rates = " ".join(f"{name} {observed[key]:.1f}" for name, key in (
+            ("obs", 'obstacles'), ("coin", 'coins'), ("tree", 'trees'), ("monster", 'monsters')))
+        rates += f" (last {SPAWN_RATE_WINDOW // 1000}s)"
+        tests = self.sim.world.tests
+        collide = f"{tests['entities']} entities, {tests['aabb']} aabb, {tests['mask']} mask"
+        pools = self.spawner.pool_stats().values()
+        pool = " ".join(f"{key} {sum(stats[key] for stats in pools)}"
+                        for key in ('live', 'free', 'high_water', 'created'))
+        drawn = self.render_queue.stats()
+        render = f"{drawn['submitted']} drawn, {drawn['culled']} culled"
+        info = {'sprites': counts, 'spawn/s': rates, 'dropped': self.spawner.dropped_spawns(),
+                'collide': collide, 'pool': pool, 'render': render, 'difficulty': self.sim.difficulty}
+        if self.spawner.worker is not None:
+            info['chunks'] = f"{self.spawner.worker.ready()} ready, {self.spawner.chunk_waits} waits"
+        return info
+
+    def run(self):
+        self.running = True
+        step_ms = 1000.0 / SIM_HZ
+        max_steps = MAX_CATCHUP_STEPS * max(1, int(self.playback_speed + 0.999))
+        accumulator = 0.0
+        self.clock.tick(FPS)
+        while self.running and self.game.running:
+            accumulator += self.clock.tick(FPS) * self.playback_speed
+            self.perf.begin_frame()
 
             for e in pygame.event.get():
+                if self.game.perf_hud.handle_event(e):
+                    continue
                 if e.type == pygame.QUIT:
                     pygame.mixer.music.stop()
                     self.running = False
@@ -230,60 +302,30 @@ class PlayScreen:
 
                         ui_action = self.ui_manager.handle_click(e.pos)
 
-            self.draw_background()
-
-            if self.countdown <= 0:
-                self.spawner.maybe_spawn_every_frame(dt)
-                self.obstacles.update(dt, 0)
-                self.coins.update(dt, 0)
-                self.treasures.update(dt, 0)
-                self.trees.update(dt, 0)
-                self.monsters.update(dt, 0)
-            else:
-
-                self.obstacles.update(dt, 0)
-                self.coins.update(dt, 0)
-                self.treasures.update(dt, 0)
-                self.trees.update(dt, 0)
-                self.monsters.update(dt, 0)
-
             mouse_pos = pygame.mouse.get_pos()
-            self.player.update(dt, mouse_pos)
-
-            self.obstacles.draw(self.screen)
-            self.trees.draw(self.screen)
-            self.coins.draw(self.screen)
-            self.treasures.draw(self.screen)
-            self.monsters.draw(self.screen)
-            
-            if self.invincible_timer > 0:
-                self.invincible_timer -= dt
-                self.invincible_blink_timer += dt
-                
-                if int(self.invincible_blink_timer / 150) % 2 == 0:
-                    self.player.image.set_alpha(80)
-                else:
-                    self.player.image.set_alpha(255)
-            else:
-                self.player.image.set_alpha(255)
-
-            self.player_group.draw(self.screen)
-
-            self.draw_countdown()
-            self.draw_score()
-            
-            self.theme_manager.draw_transition_effects(self.screen)
-
-            self.ui_manager.draw_coin_collect_effects(self.screen)
-            
-            mouse_pos = pygame.mouse.get_pos()
-            self.ui_manager.draw_control_buttons(self.screen, mouse_pos)
-
-            if self.countdown <= 0:
-                if self.handle_collisions():
-                    from screens.gameover import GameOverScreen
-                    gameover_screen = GameOverScreen(self.game, self)
-                    gameover_screen.run()
-                    self.running = False
-
-            pygame.display.flip()
+            collided = False
+            steps = 0
+            while accumulator >= step_ms and not collided and self.running:
+                if steps >= max_steps:
+                    # máy quá chậm: bỏ phần thời gian còn nợ thay vì chạy đuổi mãi
+                    accumulator = 0.0
+                    break
+                collided = self.step(step_ms, mouse_pos)
+                accumulator -= step_ms
+                steps += 1
+
+            self.render(1.0 if collided else accumulator / step_ms)
+
+            if collided:
+                from screens.gameover import GameOverScreen
+                gameover_screen = GameOverScreen(self.game, self)
+                gameover_screen.run()
+                self.running = False
+
+            with self.perf.phase("flip"):
+                pygame.display.flip()
+            self.perf.end_frame()
+
+        if self.recorder:
+            self.recorder.save()
+        self.sim.close()
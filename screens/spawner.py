@@ -1,15 +1,33 @@
 from settings import *
 import pygame
 import random
+import heapq
+import queue
+import threading
+from collections import deque
 from screens.entities import Obstacle, Coin, Treasure, Tree, Monster
 from utils import resource_path
+from spatial import ColumnIndex, find_free_spot
+from pool import EntityPool
 
 class Spawner:
-    def __init__(self, game, groups, images, speeds=None, spawn_delay_ms=2000, rates=None):
-    
+    def __init__(self, game, groups, images, speeds=None, spawn_delay_ms=2000, rates=None,
+                 clock=None, rng=None, pool_capacity=ENTITY_POOL_CAPACITY, chunks=SPAWN_CHUNKS,
+                 sync_occupancy=None):
+        """
+        clock: hàm trả về thời gian (ms), mặc định pygame.time.get_ticks
+        rng: random.Random riêng để chạy lại được (mặc định module random)
+        pool_capacity: số sprite rảnh mỗi loại giữ lại để dùng lại
+        chunks: sinh trước bố cục theo chunk trên thread riêng (ChunkPlanner) thay vì quyết định từng frame
+        sync_occupancy(sprites): gọi với các sprite trong chỉ mục spawn trước khi chọn chỗ cho sprite mới,
+          để rect của chúng là mới nhất (EntityStore không ghi rect sprite ngoài màn hình mỗi bước)
+        """
         self.game = game
+        self.rng = rng or random
+        self.clock = clock or pygame.time.get_ticks
         self.groups = groups
         self.images = images
+        self.sync_occupancy = sync_occupancy
 
         self.base_scroll_speed = 0
         self.obstacle_speed = (speeds.get('obstacle') if speeds else 8)
@@ -34,105 +52,354 @@ class Spawner:
             'tree': 1.0,
         }
 
+        self.spawn_events = {
+            'obstacle_group': self.spawn_obstacle_group,
+            'single_obstacle': self.spawn_single_obstacle,
+            'coin': self.spawn_coin,
+            'tree': self.spawn_tree,
+        }
+        # số sprite đã thực sự vào từng group (không tính lần spawn bị bỏ)
+        self.spawn_counts = dict.fromkeys(groups, 0)
+        self.recent_spawns = deque()
+        self.dropped = 0
+        self.schedule = None
         self.rates = rates if rates else default_rates
 
-        self.start_time = pygame.time.get_ticks()
+        self.index = {'obstacles': ColumnIndex(), 'trees': ColumnIndex()}
+        self.occupancy = [self.index['obstacles'], self.index['trees']]
+
+        self.pools = {
+            'obstacle': EntityPool(Obstacle, pool_capacity),
+            'coin': EntityPool(Coin, pool_capacity),
+            'tree': EntityPool(Tree, pool_capacity),
+            'treasure': EntityPool(Treasure, pool_capacity),
+            'monster': EntityPool(Monster, pool_capacity),
+        }
+
+        self.start_time = self.clock()
         self.spawn_delay = spawn_delay_ms
 
-        self.last_treasure_time = pygame.time.get_ticks()
+        self.last_treasure_time = self.clock()
         self.treasure_interval = 120_000
 
-    def _safe_add(self, sprite, group_key, max_attempts=5, jitter_x=60):
-        for _ in range(max_attempts):
-            collide_obs = pygame.sprite.spritecollideany(sprite, self.groups.get('obstacles', []))
-            collide_trees = pygame.sprite.spritecollideany(sprite, self.groups.get('trees', []))
-            if not collide_obs and not collide_trees:
-                self.groups[group_key].add(sprite)
-                return True
+        self.chunks = chunks
+        self.worker = None
+        self.pending = deque()
+        self.chunk_end = None
+        self.course_offset = None
+        self.chunk_waits = 0
+
+    def make(self, kind, img, x, y, size, speed):
+        """Tạo sprite loại kind (lấy từ pool) với tâm (x, y)"""
+        return self.pools[kind].acquire(img, x, y=y, size=size, speed=speed)
+
+    def place(self, sprite, group_key):
+        """Đưa sprite đã chọn chỗ vào group (và chỉ mục spawn nếu có)"""
+        self.groups[group_key].add(sprite)
+        self.count_spawn(group_key)
+        if group_key in self.index:
+            self.index[group_key].add(sprite)
+
+    def occupants(self):
+        """Các sprite obstacle/tree chỉ mục spawn còn giữ"""
+        return {sprite for index in self.occupancy for column in index.columns for sprite, _ in column}
+
+    def count_spawn(self, group_key):
+        """Ghi nhận một sprite đã vào group (tổng số và cửa sổ SPAWN_RATE_WINDOW gần nhất)"""
+        self.spawn_counts[group_key] += 1
+        now = self.clock()
+        recent = self.recent_spawns
+        recent.append((now, group_key))
+        while recent[0][0] <= now - SPAWN_RATE_WINDOW:
+            recent.popleft()
+
+    def observed_rates(self):
+        """Số sprite/giây thực sự vào từng group trong SPAWN_RATE_WINDOW ms gần nhất"""
+        now = self.clock()
+        window = min(SPAWN_RATE_WINDOW, max(1, now - self.start_time - self.spawn_delay))
+        counts = dict.fromkeys(self.spawn_counts, 0)
+        for when, group_key in self.recent_spawns:
+            if when > now - window:
+                counts[group_key] += 1
+        return {group_key: count * 1000 / window for group_key, count in counts.items()}
 
-            sprite.rect.centerx = max(60, min(WIDTH-60,
-                                  sprite.rect.centerx + random.randint(-jitter_x, jitter_x)))
-        return False
+    def _safe_add(self, sprite, group_key, low=60, high=WIDTH-60):
+        """
+        Đặt sprite vào chỗ trống gần vị trí dự định nhất (không chồng obstacle/tree)
+        Hàng ngang tại độ cao đó đã kín thì lùi lên hàng thấp nhất phía trên còn chỗ
+        Chỉ bỏ sprite khi không đặt được ở đâu (sprite rộng hơn [low, high]), đếm vào self.dropped
+        """
+        rect = sprite.rect
+        spot = find_free_spot(self.occupancy, rect.centerx, rect.width, rect.top, rect.bottom, low, high)
+        if spot is None:
+            sprite.kill()
+            self.dropped += 1
+            return False
+        rect.centerx, rect.top = spot
+        self.place(sprite, group_key)
+        return True
 
     def spawn_obstacle_group(self):
-        pattern = random.choice(self.obstacle_patterns)
+        pattern = self.rng.choice(self.obstacle_patterns)
 
         if len(pattern) <= 2:
             max_obs = len(pattern)
         else:
-            max_obs = random.randint(2, min(3, len(pattern)))
+            max_obs = self.rng.randint(2, min(3, len(pattern)))
 
-        chosen_positions = random.sample(pattern, max_obs)
+        chosen_positions = self.rng.sample(pattern, max_obs)
 
-        if len(chosen_positions) > 1 and random.random() < 0.7:
-            safe_x = random.choice(chosen_positions)
+        if len(chosen_positions) > 1 and self.rng.random() < 0.7:
+            safe_x = self.rng.choice(chosen_positions)
             chosen_positions.remove(safe_x)
 
         for x in chosen_positions:
-            img = random.choice(self.images.get('obstacles', []))
-            y = -random.randint(400, 700)
-            obs = Obstacle(img, x, y=y, size=(220, 220), speed=self.obstacle_speed)
+            img = self.rng.choice(self.images.get('obstacles', []))
+            y = -self.rng.randint(400, 700)
 
-            too_close = any(abs(o.rect.centerx - x) < 180 for o in self.groups['obstacles'])
-            if too_close:
+            if self.index['obstacles'].any_near(x, 180):
                 continue
 
+            obs = self.make('obstacle', img, x, y, SPRITE_SIZES['obstacle_group'], self.obstacle_speed)
             self._safe_add(obs, 'obstacles')
 
     def spawn_single_obstacle(self):
-        x = random.randint(100, WIDTH-100)
-        img = random.choice(self.images.get('obstacles', []))
-        y = -random.randint(300, 600)
-        obs = Obstacle(img, x, y=y, size=(200,200), speed=self.obstacle_speed)
+        x = self.rng.randint(100, WIDTH-100)
+        img = self.rng.choice(self.images.get('obstacles', []))
+        y = -self.rng.randint(300, 600)
+        obs = self.make('obstacle', img, x, y, SPRITE_SIZES['obstacle'], self.obstacle_speed)
         self._safe_add(obs, 'obstacles')
 
     def spawn_coin(self):
-        x = random.randint(80, WIDTH-80)
+        x = self.rng.randint(80, WIDTH-80)
         img = self.images.get('coin')
         if img:
-            y = -random.randint(220, 450)
-            coin = Coin(img, x, y=y, size=(64,64), speed=self.coin_speed)
+            y = -self.rng.randint(220, 450)
+            coin = self.make('coin', img, x, y, SPRITE_SIZES['coin'], self.coin_speed)
             self._safe_add(coin, 'coins')
 
     def spawn_tree(self):
-        x = random.randint(100, WIDTH-100)
-        img = random.choice(self.images.get('trees', []))
-        y = -random.randint(350, 600)
-        t = Tree(img, x, y=y, size=(200,220), speed=self.tree_speed)
+        x = self.rng.randint(100, WIDTH-100)
+        img = self.rng.choice(self.images.get('trees', []))
+        y = -self.rng.randint(350, 600)
+        t = self.make('tree', img, x, y, SPRITE_SIZES['tree'], self.tree_speed)
         self._safe_add(t, 'trees')
 
     def spawn_treasure_if_needed(self):
-        now = pygame.time.get_ticks()
+        now = self.clock()
         if now - self.last_treasure_time > self.treasure_interval:
-            x = random.randint(120, WIDTH-120)
+            x = self.rng.randint(120, WIDTH-120)
             img = self.images.get('treasure')
             if img:
-                tr = Treasure(img, x, y=-400, size=(140,140), speed=self.treasure_speed)
-                self.groups['treasures'].add(tr)
+                tr = self.make('treasure', img, x, -400, SPRITE_SIZES['treasure'], self.treasure_speed)
+                self.place(tr, 'treasures')
             self.last_treasure_time = now
 
     def spawn_monster_from_tree(self, tree_sprite, player_sprite):
 
-        spawn_x = player_sprite.rect.centerx + random.randint(-80, 80)
+        spawn_x = player_sprite.rect.centerx + self.rng.randint(-80, 80)
         img = self.images.get('monster')
         if img:
-            m = Monster(img, player_sprite, spawn_x=spawn_x, spawn_y=-220,
-                        size=(260,260), speed=self.monster_speed)
+            m = self.pools['monster'].acquire(img, player_sprite, spawn_x=spawn_x, spawn_y=-220,
+                                              size=SPRITE_SIZES['monster'], speed=self.monster_speed, clock=self.clock)
             self.groups['monsters'].add(m)
+            self.count_spawn('monsters')
+
+    @property
+    def rates(self):
+        return self._rates
+
+    @rates.setter
+    def rates(self, rates):
+        """Đổi tỉ lệ spawn (lần/giây) -> lịch được lập lại ở lần spawn kế tiếp"""
+        self._rates = rates
+        self.schedule = None
+
+    def next_event_time(self, kind, after):
+        """Thời điểm (ms) lần spawn kế tiếp: khoảng cách giữa hai lần theo phân phối mũ"""
+        return after + self.rng.expovariate(self._rates[kind]) * 1000
+
+    def build_schedule(self, now):
+        self.schedule = []
+        for kind in self.spawn_events:
+            if self._rates.get(kind, 0) > 0:
+                heapq.heappush(self.schedule, (self.next_event_time(kind, now), kind))
 
     def maybe_spawn_every_frame(self, dt):
-        if pygame.time.get_ticks() - self.start_time < self.spawn_delay:
+        """
+        Chạy mọi lần spawn đã đến hạn theo lịch (heap theo thời điểm)
+        Không phụ thuộc dt: frame dài thì chạy hết các lần đến hạn trong frame đó
+        """
+        if self.chunks:
+            self.spawn_planned()
+            return
+
+        now = self.clock()
+        if now - self.start_time < self.spawn_delay:
             self.spawn_treasure_if_needed()
             return
 
-        sec = dt / 1000.0
-        if random.random() < self.rates['obstacle_group'] * sec:
-            self.spawn_obstacle_group()
-        if random.random() < self.rates['single_obstacle'] * sec:
-            self.spawn_single_obstacle()
-        if random.random() < self.rates['coin'] * sec:
-            self.spawn_coin()
-        if random.random() < self.rates['tree'] * sec:
-            self.spawn_tree()
+        if self.schedule is None:
+            self.build_schedule(now)
+        schedule = self.schedule
+        if schedule and schedule[0][0] <= now and self.sync_occupancy:
+            self.sync_occupancy(self.occupants())
+        while schedule and schedule[0][0] <= now:
+            due, kind = schedule[0]
+            self.spawn_events[kind]()
+            heapq.heapreplace(schedule, (self.next_event_time(kind, due), kind))
 
         self.spawn_treasure_if_needed()
+
+    def start_lookahead(self):
+        """Chế độ chunk: bắt đầu sinh trước bố cục trên thread riêng (gọi lại không sao)"""
+        if self.chunks and self.worker is None:
+            self.worker = ChunkWorker(ChunkPlanner(self, self.rng.getrandbits(64)))
+
+    def spawn_planned(self):
+        """Chế độ chunk: chỉ lấy các spawn đã đến hạn trong các chunk đã sinh sẵn"""
+        self.start_lookahead()
+        now = self.clock()
+        if self.course_offset is None:
+            # lần gọi đầu ứng với lúc hết spawn_delay trong kế hoạch (đếm ngược có thể dài hơn delay)
+            self.course_offset = max(0, now - self.start_time - self.spawn_delay)
+        # nửa bước dư để sai số cộng dồn float không làm lệch một bước
+        course_now = now - self.course_offset + 500.0 / SIM_HZ
+
+        pending = self.pending
+        while True:
+            if pending:
+                if pending[0][0] > course_now:
+                    break
+                _, kind, group_key, img, (x, y), size, speed = pending.popleft()
+                self.groups[group_key].add(self.make(kind, img, x, y, size, speed))
+                self.count_spawn(group_key)
+            elif self.chunk_end is None or self.chunk_end <= course_now:
+                chunk, waited = self.worker.get()
+                self.chunk_waits += waited
+                self.chunk_end, entries = chunk
+                pending.extend(entries)
+            else:
+                break
+
+    def close(self):
+        """Dừng thread sinh chunk (nếu có)"""
+        if self.worker is not None:
+            self.worker.close()
+
+    def dropped_spawns(self):
+        """Số sprite phải bỏ vì không còn chỗ (chế độ chunk: planner đếm lúc lập kế hoạch)"""
+        if self.worker is not None:
+            return self.worker.planner.dropped
+        return self.dropped
+
+    def pool_stats(self):
+        """Thống kê pool từng loại: live, free, high_water, created"""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+class PlannedSprite(pygame.sprite.Sprite):
+    def __init__(self, kind, image_surface, x, y, size, speed):
+        """Sprite giữ chỗ khi lập kế hoạch: chỉ có rect, không scale ảnh"""
+        super().__init__()
+        self.kind = kind
+        self.image_surface = image_surface
+        self.size = size
+        self.speed = speed
+        self.rect = pygame.Rect((0, 0), size)
+        self.rect.center = (x, y)
+
+    def update(self, dt, scroll_speed=0):
+        self.rect.y += int(self.speed + scroll_speed)
+        # ra khỏi dải spawn thì không còn ảnh hưởng chỗ đặt sprite mới
+        if self.rect.top >= SPAWN_BAND_BOTTOM:
+            self.kill()
+
+class ChunkPlanner(Spawner):
+    def __init__(self, source, seed):
+        """
+        Spawner chạy trước trên sprite giữ chỗ, cùng tốc độ / tỉ lệ / độ trễ với source
+        Mỗi chunk là danh sách spawn (thời điểm, loại, group, ảnh, tâm, kích thước, tốc độ) đã chọn chỗ xong
+        Obstacle/tree là thứ duy nhất chiếm dải spawn và rơi đều, nên chỗ đã chọn vẫn trống khi áp vào game
+        """
+        self.time = source.start_time
+        groups = {key: pygame.sprite.Group() for key in source.groups}
+        speeds = {
+            'obstacle': source.obstacle_speed,
+            'coin': source.coin_speed,
+            'tree': source.tree_speed,
+            'treasure': source.treasure_speed,
+            'monster': source.monster_speed,
+        }
+        super().__init__(None, groups, source.images, speeds, source.spawn_delay, dict(source.rates),
+                         clock=self.now, rng=random.Random(seed), chunks=False)
+        self.treasure_interval = source.treasure_interval
+        self.entries = []
+
+    def now(self):
+        return self.time
+
+    def make(self, kind, img, x, y, size, speed):
+        return PlannedSprite(kind, img, x, y, size, speed)
+
+    def place(self, sprite, group_key):
+        super().place(sprite, group_key)
+        self.entries.append((self.time, sprite.kind, group_key, sprite.image_surface,
+                             sprite.rect.center, sprite.size, sprite.speed))
+
+    def plan_chunk(self, steps=SPAWN_CHUNK_STEPS):
+        """Chạy trước steps bước mô phỏng, trả về (thời điểm cuối chunk, các spawn theo thời gian)"""
+        step_ms = 1000.0 / SIM_HZ
+        self.entries = []
+        for _ in range(steps):
+            self.time += step_ms
+            self.maybe_spawn_every_frame(step_ms)
+            for group in self.groups.values():
+                group.update(step_ms, 0)
+        return self.time, self.entries
+
+class ChunkWorker:
+    def __init__(self, planner, lookahead=SPAWN_CHUNK_LOOKAHEAD):
+        """Thread nền gọi planner.plan_chunk() liên tục, giữ tối đa lookahead chunk trong hàng đợi"""
+        self.planner = planner
+        self.queue = queue.Queue(maxsize=lookahead)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="spawn-chunks", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                item = (self.planner.plan_chunk(), None)
+            except Exception as e:
+                item = (None, e)
+            while not self.stopped.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if item[1] is not None:
+                return
+
+    def get(self):
+        """(chunk kế tiếp, True nếu phải chờ thread sinh xong); RuntimeError nếu worker đã đóng"""
+        waited = False
+        while True:
+            if self.stopped.is_set():
+                raise RuntimeError("spawn chunk worker is closed")
+            try:
+                chunk, error = self.queue.get(timeout=0.1) if waited else self.queue.get_nowait()
+                break
+            except queue.Empty:
+                waited = True
+        if error is not None:
+            raise error
+        return chunk, waited
+
+    def ready(self):
+        return self.queue.qsize()
+
+    def close(self):
+        """Dừng thread và chờ nó thoát (gọi lặp lại không sao)"""
+        self.stopped.set()
+        self.thread.join()
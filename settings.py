@@ -1,9 +1,42 @@
 WIDTH, HEIGHT = 1920, 1080
-FPS = 60
+FPS = 60  # giới hạn tốc độ vẽ; có thể đặt 120/144 hoặc thấp hơn 60
+SIM_HZ = 60  # tần số bước mô phỏng cố định
+MAX_CATCHUP_STEPS = 5
 TITLE = "Fantascy Suffer"
 DEFAULT_VOLUME = 0.5
 DEFAULT_DIFFICULTY = "medium"
 
+# Sóng nền: một chu kỳ ~126 bước mô phỏng (wave_offset += 5 mỗi bước, pha = wave_offset * 0.01)
+# Ít pha hơn thì sóng giật: 8 pha chỉ đổi ~4 lần/giây, mỗi lần nhảy tới ~4.6 px; 128 pha đổi mỗi bước, lệch < 0.2 px
+# Cache chỉ giữ dải ngang (x, y, vùng) của mỗi pha (~80 dải, ~9 KB), không giữ frame toàn màn hình;
+# bộ nhớ lớn là một lớp nền ~8 MB (1920x1080) cho mỗi theme, không phụ thuộc số pha
+WAVE_PHASE_STEPS = 128
+WAVE_CACHE_SIZE = 256  # số (theme, pha) giữ trong cache: đủ 2 theme x WAVE_PHASE_STEPS
+PLAYER_ROTATION_STEP = 0.5
+MENU_DIRTY_RECTS = True
+BUBBLE_ALPHA_STEP = 10
+GRADIENT_CACHE_SIZE = 128
+GRADIENT_SIZE_BUCKET = 4
+COUNTDOWN_PHASE_STEPS = 16
+SPAWN_INDEX_COLUMN = 48
+SPAWN_BAND_BOTTOM = 0
+SPAWN_RATE_WINDOW = 10000  # ms: cửa sổ đo tỉ lệ spawn thực tế cho overlay hiệu năng
+SPAWN_CHUNKS = False  # sinh trước bố cục spawn theo chunk trên thread riêng
+SPAWN_CHUNK_STEPS = 120  # số bước mô phỏng mỗi chunk
+SPAWN_CHUNK_LOOKAHEAD = 4  # số chunk sinh sẵn tối đa chờ trong hàng đợi
+ENTITY_POOL_CAPACITY = 64  # số sprite rảnh tối đa mỗi loại giữ lại để dùng lại
+ENTITY_STORE = False  # di chuyển / bỏ entity bằng mảng NumPy (có lợi khi rất nhiều entity)
+ENTITY_SYNC_MARGIN = 64  # ghi rect cho entity cách mép màn hình dưới chừng này px
+HEADLESS_DODGE_LOOKAHEAD = 480  # px phía trên người chơi mà dodge_policy của run_headless nhìn tới
+RECORD_RUNS = False
+RECORDINGS_DIR = "recordings"
+PERF_TIMING = False
+PERF_HISTORY = 600
+PERF_HUD_POS = (20, 110)
+PERF_HUD_SIZE = (520, 360)
+PERF_HUD_REFRESH = 15
+PERF_DUMP_DIR = "perf"
+
 CURRENT_VOLUME = DEFAULT_VOLUME
 CURRENT_DIFFICULTY = DEFAULT_DIFFICULTY
 
@@ -48,3 +81,26 @@ DIFFICULTY_CONFIGS = {
         }
     }
 }
+
+# Ảnh sprite dùng chung cho mô phỏng (load_sprite_images), asset bundle và preload của Game
+# key ảnh -> (file hoặc [các file], kích thước nạp, {loại entity: kích thước entity scale tới})
+SPRITE_ASSETS = {
+    'player': ("resources/assets/characters/player.png", (120, 120), {'player': (150, 150)}),
+    'obstacles': ([
+        "resources/assets/backgrounds/1.png",
+        "resources/assets/backgrounds/2.png",
+        "resources/assets/backgrounds/3.png",
+        "resources/assets/backgrounds/4.png",
+        "resources/assets/backgrounds/12.png",
+        "resources/assets/backgrounds/13.png",
+    ], (150, 150), {'obstacle': (200, 200), 'obstacle_group': (220, 220)}),
+    'coin': ("resources/assets/backgrounds/11.png", (50, 50), {'coin': (64, 64)}),
+    'treasure': ("resources/assets/backgrounds/5.png", (100, 100), {'treasure': (140, 140)}),
+    'trees': ([
+        "resources/assets/backgrounds/7.png",
+        "resources/assets/backgrounds/8.png",
+    ], (200, 200), {'tree': (200, 220)}),
+    'monster': ("resources/assets/backgrounds/9.png", (200, 200), {'monster': (260, 260)}),
+}
+# loại entity -> kích thước (Spawner, Player)
+SPRITE_SIZES = {name: size for _, _, sizes in SPRITE_ASSETS.values() for name, size in sizes.items()}
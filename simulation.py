@@ -0,0 +1,267 @@
+import sys
+import time
+import random
+import hashlib
+import pygame
+from settings import *
+from screens.entities import Player
+from screens.spawner import Spawner
+from perf import PhaseTimer
+from collision import CollisionWorld, CollisionGroup
+from entity_store import EntityStore, StoreGroup, numpy
+
+def load_sprite_images(assets, convert=True):
+    """
+    Ảnh sprite cho mô phỏng, theo key của SPRITE_ASSETS
+    convert=False: không cần cửa sổ (chạy headless)
+    """
+    images = {}
+    for key, (files, size, _) in SPRITE_ASSETS.items():
+        if isinstance(files, list):
+            images[key] = [assets.image(path, size, convert=convert) for path in files]
+        else:
+            images[key] = assets.image(files, size, convert=convert)
+    return images
+
+class GameSimulation:
+    def __init__(self, images, difficulty=None, seed=None, entity_store=ENTITY_STORE,
+                 spawn_chunks=SPAWN_CHUNKS):
+        """
+        Luật chơi không phụ thuộc màn hình: spawner, di chuyển, va chạm, điểm, continue/bất tử
+        images: dict từ load_sprite_images (surface chưa convert cũng được)
+        difficulty: key trong DIFFICULTY_CONFIGS (None -> tốc độ mặc định của Spawner)
+        seed: cùng seed + cùng input -> cùng ván chơi (None -> seed ngẫu nhiên)
+        entity_store: di chuyển entity bằng EntityStore (cần numpy) thay cho Group.update
+        spawn_chunks: Spawner sinh trước bố cục theo chunk trên thread riêng (ván chơi khác với chế độ thường)
+        """
+        self.time = 0
+        self.difficulty = difficulty
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+
+        self.world = CollisionWorld()
+        if entity_store and numpy is not None:
+            self.store = EntityStore()
+            self.obstacles = StoreGroup(self.store, 'obstacle', self.world)
+            self.coins = StoreGroup(self.store, 'coin', self.world)
+            self.treasures = StoreGroup(self.store, 'treasure')
+            self.trees = StoreGroup(self.store, 'tree', self.world)
+            self.monsters = StoreGroup(self.store, 'monster', self.world)
+        else:
+            self.store = None
+            self.obstacles = CollisionGroup(self.world, 'obstacle')
+            self.coins = CollisionGroup(self.world, 'coin')
+            self.treasures = pygame.sprite.Group()
+            self.trees = CollisionGroup(self.world, 'tree')
+            self.monsters = CollisionGroup(self.world, 'monster')
+
+        groups = {
+            'obstacles': self.obstacles,
+            'coins': self.coins,
+            'treasures': self.treasures,
+            'trees': self.trees,
+            'monsters': self.monsters
+        }
+
+        self.player = Player(images.get('player'),
+                             start_x=WIDTH//2, start_y=-200,
+                             target_y=int(HEIGHT*0.62),
+                             size=SPRITE_SIZES['player'], drop_speed=20)
+        self.player_group = pygame.sprite.GroupSingle(self.player)
+
+        self.spawner = Spawner(None, groups, images, clock=self.now, rng=self.rng, chunks=spawn_chunks,
+                               sync_occupancy=self.store.sync_sprites if self.store is not None else None)
+        if difficulty:
+            self.apply_difficulty(difficulty)
+
+        self.score = 0
+        self.countdown = 3
+        self.countdown_timer = 0
+        self.invincible_timer = 0
+        self.invincible_blink_timer = 0
+        self.continue_count = 0
+        self.game_over = False
+        self.steps = 0
+        self.perf = PhaseTimer(enabled=False)
+
+    def now(self):
+        """Đồng hồ mô phỏng (ms), chỉ tăng theo step()"""
+        return self.time
+
+    def apply_difficulty(self, difficulty):
+        self.difficulty = difficulty
+        config = DIFFICULTY_CONFIGS[difficulty]
+        self.spawner.obstacle_speed = config["obstacle_speed"]
+        self.spawner.coin_speed = config["coin_speed"]
+        self.spawner.tree_speed = config["tree_speed"]
+        self.spawner.treasure_speed = config["treasure_speed"]
+        self.spawner.monster_speed = config["monster_speed"]
+        self.spawner.rates = config["spawn_rates"]
+
+    def revive(self, invincible_ms=3000):
+        """Chơi tiếp sau game over với một khoảng bất tử"""
+        self.continue_count += 1
+        self.invincible_timer = invincible_ms
+        self.invincible_blink_timer = 0
+        self.game_over = False
+
+    def step(self, dt, mouse_x):
+        """
+        Một bước mô phỏng
+        Trả về danh sách sự kiện: ('coin', x, y) khi ăn xu, ('game_over',) khi va chạm
+        """
+        events = []
+        self.time += dt
+        self.steps += 1
+
+        if self.countdown > 0:
+            self.countdown_timer += dt
+            if self.countdown_timer >= 1000:
+                self.countdown -= 1
+                self.countdown_timer = 0
+
+        with self.perf.phase("update"):
+            if self.countdown <= 0:
+                self.spawner.maybe_spawn_every_frame(dt)
+            else:
+                # chunk đầu tiên được sinh trong lúc đếm ngược
+                self.spawner.start_lookahead()
+            if self.store is not None:
+                rect = self.player.rect
+                self.store.step(self.time, rect.centerx,
+                                min(-ENTITY_SYNC_MARGIN, rect.top),
+                                max(HEIGHT + ENTITY_SYNC_MARGIN, rect.bottom))
+            else:
+                self.obstacles.update(dt, 0)
+                self.coins.update(dt, 0)
+                self.treasures.update(dt, 0)
+                self.trees.update(dt, 0)
+                self.monsters.update(dt, 0)
+            self.world.advance()
+            self.player.update(dt, (mouse_x, 0))
+
+        if self.invincible_timer > 0:
+            self.invincible_timer -= dt
+            self.invincible_blink_timer += dt
+
+        if self.countdown <= 0:
+            with self.perf.phase("collisions"):
+                collided = self.handle_collisions(events)
+            if collided:
+                self.game_over = True
+                events.append(('game_over',))
+        return events
+
+    def handle_collisions(self, events):
+        """Xử lý va chạm & luật chơi trên một lượt contact; True nếu người chơi thua"""
+        coins_hit = []
+        trees_hit = []
+        hit_obstacle = hit_monster = False
+        for kind, sprite in self.world.contacts(self.player):
+            if kind == 'coin':
+                coins_hit.append(sprite)
+            elif kind == 'tree':
+                trees_hit.append(sprite)
+            elif kind == 'obstacle':
+                hit_obstacle = True
+            elif kind == 'monster':
+                hit_monster = True
+
+        if coins_hit:
+            self.player.coins_collected += len(coins_hit)
+            self.score += int(5 * len(coins_hit) * self.player.score_multiplier)
+
+            for coin in coins_hit:
+                coin.kill()
+                events.append(('coin', coin.rect.centerx, coin.rect.centery))
+
+        if self.invincible_timer > 0 or self.player.invincible:
+            self.call_monsters(trees_hit)
+            return False
+
+        if hit_obstacle:
+            return True
+
+        self.call_monsters(trees_hit)
+        return hit_monster
+
+    def call_monsters(self, trees_hit):
+        """Chạm cây lần đầu -> gọi quái vật"""
+        for t in trees_hit:
+            if not getattr(t, 'called_monster', False):
+                t.called_monster = True
+                self.spawner.spawn_monster_from_tree(t, self.player)
+
+    def close(self):
+        self.spawner.close()
+
+    def digest(self):
+        """Hash trạng thái hiện tại để so sánh hai lần chạy"""
+        if self.store is not None:
+            self.store.sync_all()
+        h = hashlib.sha1()
+        h.update(repr((self.steps, self.score, self.player.coins_collected,
+                       self.continue_count, self.game_over, tuple(self.player.rect))).encode())
+        for group in (self.obstacles, self.coins, self.treasures, self.trees, self.monsters):
+            h.update(repr([tuple(sprite.rect) for sprite in group]).encode())
+        return h.hexdigest()
+
+def dodge_policy(sim, lookahead=HEADLESS_DODGE_LOOKAHEAD, step=16):
+    """
+    Policy cho run_headless: đưa người chơi tới x gần nhất không có vật cản/cây/quái vật sắp tới
+    Không lướt ngang qua vật đã ở sát người chơi (trừ vật đang chắn ngay cột hiện tại)
+    """
+    player = sim.player.rect
+    half = player.width // 2 + 8
+    threats = [sprite.rect for group in (sim.obstacles, sim.trees, sim.monsters) for sprite in group
+               if sprite.rect.bottom > player.top - lookahead and sprite.rect.top < player.bottom]
+
+    def column(x):
+        return [rect for rect in threats if rect.left < x + half and rect.right > x - half]
+
+    here = column(player.centerx)
+    if not here:
+        return player.centerx
+    walls = [rect for rect in threats if rect.bottom > player.top - lookahead // 3 and rect not in here]
+    best = player.centerx
+    for direction in (-1, 1):
+        x = player.centerx + direction * step
+        while half <= x <= WIDTH - half:
+            if any(rect.left < x + half and rect.right > x - half for rect in walls):
+                break
+            if not column(x):
+                if best == player.centerx or abs(x - player.centerx) < abs(best - player.centerx):
+                    best = x
+                break
+            x += direction * step
+    return best
+
+def run_headless(sim, seconds, policy=None, revive=False):
+    """
+    Chạy mô phỏng nhanh nhất có thể, không cần cửa sổ
+    policy(sim) -> mouse x cho mỗi bước (mặc định: giữ nguyên vị trí)
+    revive: game over thì chơi tiếp (sim.revive()) thay vì dừng
+    """
+    step_ms = 1000.0 / SIM_HZ
+    for _ in range(int(seconds * SIM_HZ)):
+        mouse_x = policy(sim) if policy else sim.player.rect.centerx
+        sim.step(step_ms, mouse_x)
+        if sim.game_over:
+            if not revive:
+                break
+            sim.revive()
+    return sim
+
+if __name__ == "__main__":
+    from asset_manager import AssetManager
+    difficulty = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DIFFICULTY
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+    sim = GameSimulation(load_sprite_images(AssetManager(), convert=False), difficulty)
+    started = time.perf_counter()
+    run_headless(sim, seconds, dodge_policy, revive=True)
+    elapsed = time.perf_counter() - started
+    sim.close()
+    print(f"{difficulty}: {sim.steps} steps ({sim.time / 1000:.1f}s game time) in {elapsed:.2f}s, "
+          f"score {sim.score}, continues: {sim.continue_count}")
+    for name, stats in sim.spawner.pool_stats().items():
+        print(f"  pool {name}: " + ", ".join(f"{key} {value}" for key, value in stats.items()))
@@ -0,0 +1,149 @@
+import math
+import pygame
+from collections import deque
+from settings import *
+
+class ColumnIndex:
+    def __init__(self, width=WIDTH, column_width=SPAWN_INDEX_COLUMN, band_bottom=SPAWN_BAND_BOTTOM):
+        """
+        Chỉ mục theo cột x của dải spawn phía trên màn hình
+        Dành cho sprite chỉ rơi thẳng xuống (x không đổi sau khi spawn)
+        Mỗi cột giữ (sprite, rect) có rect phủ cột đó theo thứ tự spawn; sprite đã kill()
+        hoặc đã rơi qua band_bottom bị bỏ dần từ đầu cột khi truy vấn
+        Giữ cả rect: sprite lấy lại từ pool có rect mới, mục cũ vẫn trỏ rect cũ đã nằm dưới màn hình
+        """
+        self.width = width
+        self.column_width = max(1, column_width)
+        self.band_bottom = band_bottom
+        self.count = (width + self.column_width - 1) // self.column_width
+        self.columns = [deque() for _ in range(self.count)]
+        self.tests = 0
+
+    def span(self, left, right):
+        """Các cột mà đoạn [left, right) phủ lên"""
+        first = max(0, int(left) // self.column_width)
+        last = min(self.count - 1, (int(right) - 1) // self.column_width)
+        return range(first, last + 1)
+
+    def add(self, sprite):
+        rect = sprite.rect
+        for c in self.span(rect.left, rect.right):
+            self.columns[c].append((sprite, rect))
+
+    def column(self, c):
+        column = self.columns[c]
+        while column and (column[0][1].top >= self.band_bottom or not column[0][0].alive()):
+            column.popleft()
+        return column
+
+    def overlaps(self, rect):
+        """Có sprite nào chồng lên rect không (chỉ xét các cột rect phủ)"""
+        for c in self.span(rect.left, rect.right):
+            for sprite, other in self.column(c):
+                self.tests += 1
+                if other.colliderect(rect) and sprite.alive():
+                    return True
+        return False
+
+    def blockers(self, left, right, top, bottom):
+        """(sprite, rect) trong các cột phủ [left, right) có rect chồng lên đoạn y [top, bottom)"""
+        for c in self.span(left, right):
+            for sprite, rect in self.column(c):
+                self.tests += 1
+                if rect.top < bottom and rect.bottom > top and sprite.alive():
+                    yield sprite, rect
+
+    def any_near(self, x, distance):
+        """Có sprite nào trong dải spawn có centerx cách x dưới distance không"""
+        for c in self.span(x - distance + 1, x + distance):
+            for sprite, rect in self.column(c):
+                self.tests += 1
+                if abs(rect.centerx - x) < distance and rect.top < self.band_bottom and sprite.alive():
+                    return True
+        return False
+
+def nearest_free_center(rects, x, width, low, high):
+    """
+    Tâm nguyên trong [low, high] gần x nhất để rect rộng width (đặt bằng rect.centerx) không chồng rects theo trục x
+    Gộp các khoảng tâm bị chặn thành khoảng rời nhau rồi lấy điểm gần x nhất trong các khoảng trống; None nếu kín
+    """
+    half = width // 2
+    target = min(high, max(low, int(x)))
+    # tâm c bị rect r chặn khi c - half < r.right và c - half + width > r.left
+    blocked = sorted((rect.left - width + half + 1, rect.right + half - 1) for rect in rects)
+    best = None
+    start = low
+    for first, last in blocked + [(high + 1, high + 1)]:
+        if first > start:
+            gap_high = min(high, first - 1)
+            if start <= gap_high:
+                candidate = min(gap_high, max(start, target))
+                if best is None or abs(candidate - x) < abs(best - x):
+                    best = candidate
+        start = max(start, last + 1)
+        if start > high:
+            break
+    return best
+
+def band_blockers(indexes, low, high, width, top, bottom):
+    """Rect (không trùng) trong indexes có thể chặn tâm thuộc [low, high] ở đoạn y [top, bottom)"""
+    half = width // 2
+    rects = {}
+    for index in indexes:
+        for sprite, rect in index.blockers(low - half, high - half + width, top, bottom):
+            rects[id(rect)] = rect
+    return list(rects.values())
+
+def find_free_x(indexes, x, width, top, bottom, low=0, high=WIDTH):
+    """
+    Tâm x (nguyên) gần x nhất để rect rộng width đặt bằng rect.centerx, cao [top, bottom),
+    không chồng sprite nào trong indexes; tâm phải nằm trong [low, high], None nếu cả hàng đã kín
+    """
+    low, high = math.ceil(low), math.floor(high)
+    if low > high:
+        return None
+    target = min(high, max(low, int(x)))
+    rect = pygame.Rect(target - width // 2, top, width, bottom - top)
+    if not any(index.overlaps(rect) for index in indexes):
+        return target
+    return nearest_free_center(band_blockers(indexes, low, high, width, top, bottom), x, width, low, high)
+
+def find_free_spot(indexes, x, width, top, bottom, low=0, high=WIDTH):
+    """
+    (tâm x, top) cho rect cao bottom - top: hàng [top, bottom) nếu còn chỗ, không thì hàng thấp nhất phía trên có chỗ
+    Hàng chỉ thoáng thêm khi đáy rect vượt lên trên đỉnh một sprite, nên chỉ cần thử các độ cao đó
+    None chỉ khi [low, high] rỗng
+    """
+    free_x = find_free_x(indexes, x, width, top, bottom, low, high)
+    if free_x is not None:
+        return free_x, top
+    low, high = math.ceil(low), math.floor(high)
+    height = bottom - top
+    # quét từ dưới lên: rect vào tập đang chặn khi hàng lên quá đáy nó, ra khi đáy hàng vượt đỉnh nó
+    # hàng trước đã kín nên chỗ trống mới chỉ có thể nằm trong cửa sổ tâm của các rect vừa ra
+    half = width // 2
+    rects = sorted(band_blockers(indexes, low, high, width, -math.inf, bottom), key=lambda rect: -rect.bottom)
+    leaving = {}
+    for rect in rects:
+        if rect.top - height < top:
+            leaving.setdefault(rect.top - height, []).append(rect)
+    active = []
+    entered = 0
+    for row in sorted(leaving, reverse=True):
+        while entered < len(rects) and rects[entered].bottom > row:
+            active.append(rects[entered])
+            entered += 1
+        active = [rect for rect in active if rect.top < row + height]
+        best = None
+        for gone in leaving[row]:
+            window_low = max(low, gone.left - width + half + 1)
+            window_high = min(high, gone.right + half - 1)
+            if window_low > window_high:
+                continue
+            free_x = nearest_free_center([rect for rect in active if rect.left - width + half < window_high
+                                          and rect.right + half > window_low], x, width, window_low, window_high)
+            if free_x is not None and (best is None or abs(free_x - x) < abs(best - x)):
+                best = free_x
+        if best is not None:
+            return best, row
+    return None
@@ -0,0 +1,100 @@
+"""
+Tỉ lệ sprite thực sự vào group khớp spawn_rates của DIFFICULTY_CONFIGS
+
+Spawner chạy từng bước mô phỏng cố định (1/SIM_HZ giây) như trong game, sprite rơi và bị bỏ như thật;
+group tự đếm sprite được thêm vào, không đọc bộ đếm của Spawner. Cộng dồn nhiều seed rồi so với
+kỳ vọng Poisson tính từ cấu hình (lệch quá Z_LIMIT độ lệch chuẩn là lỗi)
+"""
+import os
+import sys
+import math
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+from settings import *
+from asset_manager import AssetManager
+from simulation import load_sprite_images
+from screens.spawner import Spawner
+
+SEEDS = (11, 2024, 31337)
+SECONDS = 120
+Z_LIMIT = 4.0
+
+class CountingGroup(pygame.sprite.Group):
+    def __init__(self):
+        super().__init__()
+        self.added = 0
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.added += 1
+
+class StepClock:
+    def __init__(self):
+        self.ms = 0.0
+
+    def __call__(self):
+        return self.ms
+
+@pytest.fixture(scope="module")
+def images():
+    return load_sprite_images(AssetManager(), convert=False)
+
+def group_size_mean(patterns):
+    """Số obstacle trung bình mỗi lần spawn_obstacle_group (trước khi bỏ vị trí quá gần obstacle khác)"""
+    total = 0.0
+    for pattern in patterns:
+        n = len(pattern)
+        sizes = [n] if n <= 2 else list(range(2, min(3, n) + 1))
+        # sau khi chọn, 70% số lần bỏ bớt một vị trí để chừa đường đi
+        total += sum(0.3 * m + 0.7 * (m - 1) if m > 1 else m for m in sizes) / len(sizes)
+    return total / len(patterns)
+
+def run(images, difficulty, seed, seconds=SECONDS):
+    """Chạy spawner seconds giây (sau spawn_delay), trả về (group, spawner)"""
+    clock = StepClock()
+    groups = {name: CountingGroup() for name in ('obstacles', 'coins', 'treasures', 'trees', 'monsters')}
+    config = DIFFICULTY_CONFIGS[difficulty]
+    speeds = {kind: config[f"{kind}_speed"] for kind in ('obstacle', 'coin', 'tree', 'treasure', 'monster')}
+    spawner = Spawner(None, groups, images, speeds, rates=config["spawn_rates"],
+                      clock=clock, rng=random.Random(seed), chunks=False)
+
+    step_ms = 1000.0 / SIM_HZ
+    for _ in range(int((spawner.spawn_delay / 1000 + seconds) * SIM_HZ)):
+        clock.ms += step_ms
+        spawner.maybe_spawn_every_frame(step_ms)
+        for group in groups.values():
+            group.update(step_ms, 0)
+    return groups, spawner
+
+def z_score(observed, expected):
+    return (observed - expected) / math.sqrt(expected)
+
+@pytest.mark.parametrize("difficulty", sorted(DIFFICULTY_CONFIGS))
+def test_placed_sprites_match_configured_rates(images, difficulty):
+    rates = DIFFICULTY_CONFIGS[difficulty]["spawn_rates"]
+    observed = dict.fromkeys(('obstacles', 'coins', 'trees'), 0)
+    dropped = 0
+    for seed in SEEDS:
+        groups, spawner = run(images, difficulty, seed)
+        for name in observed:
+            observed[name] += groups[name].added
+            assert spawner.spawn_counts[name] == groups[name].added
+        dropped += spawner.dropped
+    elapsed = SECONDS * len(SEEDS)
+
+    assert dropped == 0
+    assert abs(z_score(observed['coins'], rates['coin'] * elapsed)) <= Z_LIMIT
+    assert abs(z_score(observed['trees'], rates['tree'] * elapsed)) <= Z_LIMIT
+
+    # mỗi lần single_obstacle đặt đúng một obstacle; spawn_obstacle_group bỏ vị trí quá gần obstacle
+    # khác nên chỉ có cận trên
+    single = rates['single_obstacle'] * elapsed
+    grouped = rates['obstacle_group'] * elapsed * group_size_mean(spawner.obstacle_patterns)
+    assert z_score(observed['obstacles'], single) >= -Z_LIMIT
+    assert z_score(observed['obstacles'], single + grouped) <= Z_LIMIT
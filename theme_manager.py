@@ -4,7 +4,8 @@ import random
 from utils import resource_path
 
 class ThemeManager:
-    def __init__(self):
+    def __init__(self, assets=None):
+        self.assets = assets
         self.current_theme = "light"
         self.theme_timer = 0
         self.theme_duration = 30000
@@ -44,10 +45,27 @@ class ThemeManager:
         }
 
         self.transition_particles = []
+        self.theme_listeners = []
     
     def get_current_theme(self):
         return self.themes[self.current_theme]
     
+    def get_background_image(self, size=None):
+        """Ảnh nền của theme hiện tại (qua AssetManager)"""
+        path = self.get_current_theme()['background_image']
+        if self.assets:
+            return self.assets.image(path, size, alpha=False, smooth=False)
+        image = pygame.image.load(path).convert()
+        return pygame.transform.scale(image, size) if size else image
+    
+    def get_next_theme(self):
+        """Theme sẽ chuyển tới"""
+        return self.themes["dark" if self.current_theme == "light" else "light"]
+    
+    def add_theme_listener(self, callback):
+        """Đăng ký callback(old_theme, new_theme) khi đổi theme"""
+        self.theme_listeners.append(callback)
+    
     def update(self, dt):
         """Cập nhật thời gian và trạng thái chuyển theme"""
         self.theme_timer += dt
@@ -102,7 +120,10 @@ class ThemeManager:
         self.is_transitioning = False
         self.transition_timer = 0
         
+        old_theme = self.get_current_theme()
         self.current_theme = "dark" if self.current_theme == "light" else "light"
+        for callback in self.theme_listeners:
+            callback(old_theme, self.get_current_theme())
     
     def draw_transition_effects(self, screen):
         """Vẽ hiệu ứng chuyển"""
@@ -114,11 +135,6 @@ class ThemeManager:
             pygame.draw.circle(screen, color,
                              (int(p['x']), int(p['y'])),
                              p['size'])
-        
-        fade_alpha = int(100 * (self.transition_timer / self.transition_duration))
-        fade_surface = pygame.Surface((1920, 1080), pygame.SRCALPHA)
-        fade_surface.fill((0, 0, 0, fade_alpha))
-        screen.blit(fade_surface, (0, 0))
     
     def get_theme_progress(self):
         """Tiến độ theme"""
@@ -2,14 +2,23 @@ import pygame
 import math
 import random
 from utils import resource_path
+from gradients import gradient_cache
+from hud_text import HudNumber
+from font_registry import fonts
 
 class UIManager:
+    FONTS = [(None, 48), (None, 44), (None, 32), (None, 25), (None, 24)]
+
     def __init__(self, theme_manager):
         self.theme_manager = theme_manager
 
-        self.score_font = pygame.font.Font(None, 48)
-        self.coin_font = pygame.font.Font(None, 44)
-        self.button_font = pygame.font.Font(None, 32)
+        fonts.preload(self.FONTS)
+        self.score_font = fonts.get(None, 48)
+        self.coin_font = fonts.get(None, 44)
+        self.button_font = fonts.get(None, 32)
+
+        self.score_number = HudNumber(self.score_font, (0, 255, 0), (0, 100, 0), (0, 0, 0))
+        self.coin_number = HudNumber(self.coin_font, (0, 255, 0), (0, 100, 0))
 
         self.score_panel_rect = pygame.Rect(1600, 20, 320, 100)
         self.coin_panel_rect = pygame.Rect(1600, 130, 320, 80)
@@ -52,20 +61,10 @@ class UIManager:
     def draw_gradient_panel(self, surface, rect, color1, color2, border_radius=15):
         """Vẽ panel với gradient"""
         x, y, w, h = rect
-        gradient_surface = pygame.Surface((w, h), pygame.SRCALPHA)
-        
-        for i in range(h):
-            ratio = i / h
-            r = int(color1[0] + (color2[0] - color1[0]) * ratio)
-            g = int(color1[1] + (color2[1] - color1[1]) * ratio)
-            b = int(color2[2] + (color2[2] - color2[2]) * ratio)
-            a = color1[3] if len(color1) > 3 else 255
-            
-            pygame.draw.line(gradient_surface, (r, g, b, a), (0, i), (w, i))
-        
-        mask_surface = pygame.Surface((w, h), pygame.SRCALPHA)
-        pygame.draw.rect(mask_surface, (255, 255, 255), (0, 0, w, h), border_radius=border_radius)
-        gradient_surface.blit(mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+        a = color1[3] if len(color1) > 3 else 255
+        top = (color1[0], color1[1], color2[2], a)
+        bottom = (color2[0], color2[1], color2[2], a)
+        gradient_surface = gradient_cache.get((w, h), top, bottom, border_radius)
         
         surface.blit(gradient_surface, (x, y))
     
@@ -103,38 +102,12 @@ class UIManager:
         star_rect = pygame.Rect(panel_rect.x + 20, panel_rect.y + 20, 60, 60)
         self.draw_enhanced_star_icon(surface, star_rect, (255, 255, 0))
        
-        try:
-            score_text = self.score_font.render(f"{score:,}", True, (0, 255, 0))
-            shadow_text = self.score_font.render(f"{score:,}", True, (0, 100, 0))
-            outline_text = self.score_font.render(f"{score:,}", True, (0, 0, 0))
-        except:
-            score_text = pygame.font.Font(None, 48).render(f"{score:,}", True, (0, 255, 0))
-            shadow_text = pygame.font.Font(None, 48).render(f"{score:,}", True, (0, 100, 0))
-            outline_text = pygame.font.Font(None, 48).render(f"{score:,}", True, (0, 0, 0))
-   
-        score_rect = score_text.get_rect()
-        score_x = panel_rect.x + 90 + (panel_rect.width - 90 - score_rect.width) // 2
+        score_surface, score_width = self.score_number.get(score)
+        score_x = panel_rect.x + 90 + (panel_rect.width - 90 - score_width) // 2
         score_y = panel_rect.y + 18
+        offset = self.score_number.offset
    
-        surface.blit(outline_text, (score_x - 2, score_y))
-        surface.blit(outline_text, (score_x + 2, score_y))
-        surface.blit(outline_text, (score_x, score_y - 2))
-        surface.blit(outline_text, (score_x, score_y + 2))
-        surface.blit(shadow_text, (score_x + 3, score_y + 3))
-        surface.blit(score_text, (score_x, score_y))
-        label_text = self.button_font.render("", True, (0, 255, 0))
-        label_outline = self.button_font.render("", True, (0, 0, 0))
-
-        label_rect = label_text.get_rect()
-        label_x = panel_rect.x + 90 + (panel_rect.width - 90 - label_rect.width) // 2
-        label_y = panel_rect.y + 58
-  
-        surface.blit(label_outline, (label_x - 2, label_y))
-        surface.blit(label_outline, (label_x + 2, label_y))
-        surface.blit(label_outline, (label_x, label_y - 2))
-        surface.blit(label_outline, (label_x, label_y + 2))
-        
-        surface.blit(label_text, (label_x, label_y))
+        surface.blit(score_surface, (score_x - offset, score_y - offset))
         
     def draw_enhanced_star_icon(self, surface, rect, color):
         """Vẽ icon ngôi sao nâng cao với hiệu ứng"""
@@ -181,28 +154,12 @@ class UIManager:
         coin_rect = pygame.Rect(self.coin_panel_rect.x + 20, self.coin_panel_rect.y + 15, 50, 50)
         self.draw_enhanced_coin_icon(surface, coin_rect, (255, 255, 0))
         
-        try:
-            coin_text = self.coin_font.render(f"{coins:,}", True, (0, 255, 0))
-            shadow_text = self.coin_font.render(f"{coins:,}", True, (0, 100, 0))
-        except:
-
-            coin_text = pygame.font.Font(None, 44).render(f"{coins:,}", True, (0, 255, 0))
-            shadow_text = pygame.font.Font(None, 44).render(f"{coins:,}", True, (0, 100, 0))
-        
-        coin_rect = coin_text.get_rect()
-        coin_x = self.coin_panel_rect.x + 85 + (self.coin_panel_rect.width - 85 - coin_rect.width) // 2
+        coin_surface, coin_width = self.coin_number.get(coins)
+        coin_x = self.coin_panel_rect.x + 85 + (self.coin_panel_rect.width - 85 - coin_width) // 2
         coin_y = self.coin_panel_rect.y + 17
+        offset = self.coin_number.offset
         
-        surface.blit(shadow_text, (coin_x + 3, coin_y + 3))
-        surface.blit(coin_text, (coin_x, coin_y))
-        
-        label_text = self.button_font.render("", True, (0, 255, 0))
-        
-        label_rect = label_text.get_rect()
-        label_x = self.coin_panel_rect.x + 85 + (self.coin_panel_rect.width - 85 - label_rect.width) // 2
-        label_y = self.coin_panel_rect.y + 45
-        
-        surface.blit(label_text, (label_x, label_y))
+        surface.blit(coin_surface, (coin_x - offset, coin_y - offset))
         
     def draw_star_icon(self, surface, rect, color):
         """Vẽ icon ngôi sao"""
@@ -235,10 +192,7 @@ class UIManager:
         
         pygame.draw.circle(surface, (200, 200, 0), (center_x, center_y), radius, 3)
         
-        try:
-            font = pygame.font.Font(None, radius)
-        except:
-            font = pygame.font.Font(None, radius)
+        font = fonts.get(None, radius)
         
         dollar_text = font.render("$", True, (255, 255, 255))
         text_rect = dollar_text.get_rect(center=(center_x, center_y))
@@ -263,7 +217,7 @@ class UIManager:
         border_width = 4 if hovered else 2
         pygame.draw.rect(surface, border_color, rect, border_width, border_radius=15)
         
-        font = pygame.font.Font(None, 24)
+        font = fonts.get(None, 24)
         icon_text = font.render(icon, True, theme['text_color'])
         icon_rect = icon_text.get_rect(center=rect.center)
         surface.blit(icon_text, icon_rect)
@@ -299,11 +253,7 @@ class UIManager:
         progress_rect = pygame.Rect(32, 32, progress_width, 36)
         pygame.draw.rect(surface, theme['accent_color'], progress_rect, border_radius=18)
         
-        try:
-            theme_text = self.button_font.render(f"{theme['name']}", True, theme['text_color'])
-        except:
-
-            theme_text = pygame.font.Font(None, 32).render(f"{theme['name']}", True, theme['text_color'])
+        theme_text = self.button_font.render(f"{theme['name']}", True, theme['text_color'])
         text_rect = theme_text.get_rect(center=indicator_rect.center)
         surface.blit(theme_text, text_rect)
         
@@ -312,10 +262,7 @@ class UIManager:
         else:
             icon = ""
         
-        try:
-            icon_font = pygame.font.Font(None, 24)
-        except:
-            icon_font = pygame.font.Font(None, 20)
+        icon_font = fonts.get(None, 24)
         
         icon_text = icon_font.render(icon, True, theme['text_color'])
         surface.blit(icon_text, (indicator_rect.x + 10, indicator_rect.y + 10))